@@ -24,13 +24,67 @@ class Settings(BaseSettings):
     # SFU API
     SFU_API_BASE_URL: str = "https://www.sfu.ca/bin/wcm/course-outlines"
     SFU_COURYS_BASE_URL: str = "https://courses.students.sfu.ca"
+    COURSYS_BASE_URL: str = "https://coursys.sfu.ca"
     
     # Crawler Settings
     CRAWLER_CONCURRENCY_LIMIT: int = 5
     CRAWLER_TIMEOUT: int = 30
+    CRAWLER_QUEUE_SIZE: int = 500  # Parsed courses buffered ahead of the DB writer
+    CRAWLER_WRITE_BATCH_SIZE: int = 100  # Courses upserted per transaction
+    DEPARTMENT_INDEX_TTL_SECONDS: int = 86400  # How long term/department listings are cached
+    
+    # HTTP Client Pool
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False  # Requires the optional 'h2' package
+    HTTP_USER_AGENT: str = "SFU-Course-Tracker/1.0 (Educational Project)"
+    
+    # Upstream Rate Limits (requests per second, burst size); 0 disables
+    OUTLINES_RATE_LIMIT: float = 5.0
+    OUTLINES_RATE_BURST: int = 10
+    COURSYS_RATE_LIMIT: float = 3.0
+    COURSYS_RATE_BURST: int = 5
+    RMP_RATE_LIMIT: float = 1.0
+    RMP_RATE_BURST: int = 2
+    
+    # Upstream Resilience
+    UPSTREAM_RETRY_ATTEMPTS: int = 3  # Total tries per request, including the first
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.5  # Seconds; doubled per retry, with full jitter
+    UPSTREAM_RETRY_MAX_DELAY: float = 8.0
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.2  # Retries allowed per request, per host
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    CIRCUIT_BREAKER_RESET_SECONDS: float = 30.0  # Open time before a trial request
     
     # Worker Settings
-    SEAT_CHECK_INTERVAL_MINUTES: int = 10
+    SEAT_CHECK_INTERVAL_MINUTES: int = 10  # Starting interval for each section
+    SEAT_CHECK_MIN_INTERVAL_MINUTES: float = 2.0  # Volatile sections are checked this often at most
+    SEAT_CHECK_MAX_INTERVAL_MINUTES: float = 60.0  # Stable sections are checked at least this often
+    SEAT_CHECK_REQUEST_BUDGET: int = 0  # Max CourSys offerings fetched per cycle, highest priority first (seat-page fallbacks are extra); 0 checks all
+    SEAT_HISTORY_RAW_DAYS: int = 14  # Older seat history is downsampled to one change per hour
+    SEAT_HISTORY_RETENTION_DAYS: int = 365  # Older seat history is folded into a single keyframe
+    SEAT_CHECK_CONCURRENCY: int = 0  # Sections checked at once; 0 uses COURSYS_RATE_BURST
+    ENROLLMENT_DEADLINES: dict[str, str] = {}  # Term -> last day to add, e.g. {"Spring 2026": "2026-01-16"}
+    RUN_WORKER_IN_API: bool = True  # Set false on API replicas when running worker.py separately
+    WORKER_SHARDS: int = 1  # Sections are split into this many shards, each leased to one worker process
+    WORKER_LEASE_SECONDS: float = 60.0  # Leases are renewed every third of this; a dead worker's shards free up after it
+    
+    # Live seat updates: empty keeps events in this process; set a Redis URL
+    # (redis://[:password@]host:port) to fan out across API processes
+    EVENT_BUS_URL: str = ""
+    EVENT_BUS_CHANNEL: str = "seat_changes"
+    
+    # Seat Alerts (alerts are only logged while SMTP_HOST is empty)
+    SMTP_HOST: str = ""
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = True  # STARTTLS before logging in
+    ALERT_FROM_EMAIL: str = "alerts@localhost"
+    ALERT_COALESCE_SECONDS: float = 60.0  # Alerts for one user within this window go out as one email
+    ALERT_DEDUPE_MINUTES: float = 60.0  # The same section isn't alerted to a user again within this window
+    ALERT_SEND_CONCURRENCY: int = 4  # Emails sent at once
+    ALERT_SEND_ATTEMPTS: int = 3  # Tries per email, including the first
     
     # CORS
     ALLOWED_ORIGINS: list[str] = [
@@ -2,160 +2,232 @@
 SFU Course Outlines API Client
 Fetches course data from SFU's public API and enrollment data from CourSys
 """
-import requests
-import time
-from typing import Dict, List, Optional, Tuple
+import asyncio
+from typing import Dict, List, Optional, Tuple, Union
 import json
-import re
-from bs4 import BeautifulSoup
+import httpx
 
+from config import settings
+from services.crawl_journal import CrawlJournal, course_unit, dept_unit, section_unit
+from services.enrollment_extractor import extract_enrollment
+from services.enrollment_source import CourSysEnrollmentSource, build_coursys_id, plan_enrollment_requests
+from services.http_client import get_http_client
+from services.resilience import Stale, resilient_get
 
-class SFUAPIClient:
+
+def parse_enrollment_html(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract enrollment and waitlist from a CourSys browse/info page
+    
+    Returns:
+        Tuple of (enrolled/capacity, waitlist) e.g., ("161/331", "5")
+    """
+    return extract_enrollment(html)
+
+
+class AsyncSFUAPIClient:
+    """
+    Async client for the SFU Course Outlines API and CourSys enrollment.
+    
+    Uses the shared pooled HTTP client, bounds in-flight requests with a
+    semaphore and paces them with the shared per-host rate limiters, so
+    courses, sections and enrollment lookups are fetched concurrently.
+    """
     BASE_URL = "http://www.sfu.ca/bin/wcm/course-outlines"
     COURSYS_URL = "https://coursys.sfu.ca/browse/info"
     
-    def __init__(self, rate_limit_delay: float = 0.5):
+    def __init__(self, concurrency_limit: Optional[int] = None,
+                 client: Optional[httpx.AsyncClient] = None,
+                 journal: Optional[CrawlJournal] = None,
+                 base_url: Optional[str] = None,
+                 coursys_url: Optional[str] = None,
+                 enrollment: Optional[CourSysEnrollmentSource] = None):
         """
-        Initialize the SFU API client
+        Initialize the async SFU API client
         
         Args:
-            rate_limit_delay: Delay between requests in seconds (to be respectful)
+            concurrency_limit: Max in-flight requests (defaults to CRAWLER_CONCURRENCY_LIMIT)
+            client: HTTP client to use (defaults to the shared pooled client)
+            journal: Records completed departments, courses and sections;
+                     units already in the journal are replayed, not re-fetched
+            base_url: Outlines API URL override (e.g., a local stand-in)
+            coursys_url: CourSys browse/info URL override
+            enrollment: CourSys enrollment source to share (defaults to one
+                        of this client's own, bounded by its semaphore)
         """
-        self.rate_limit_delay = rate_limit_delay
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'SFU-Course-Tracker/1.0 (Educational Project)'
-        })
+        if base_url:
+            self.BASE_URL = base_url
+        if coursys_url:
+            self.COURSYS_URL = coursys_url
+        self.semaphore = asyncio.Semaphore(concurrency_limit or settings.CRAWLER_CONCURRENCY_LIMIT)
+        self._client = client
+        self.journal = journal
+        self.enrollment = enrollment or CourSysEnrollmentSource(self.COURSYS_URL, client, self.semaphore)
+        # Each offering is fetched once per crawl (or client, outside crawls)
+        self._enrollment_cycle = self.enrollment.cycle()
     
-    def _make_request(self, params: str) -> Optional[Dict]:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client if self._client is not None else get_http_client()
+    
+    async def _get(self, url: str) -> httpx.Response:
+        """Rate-limited GET bounded by the concurrency semaphore, retried on transient failures"""
+        return await resilient_get(self.client, url, self.semaphore, timeout=10)
+    
+    async def _make_request(self, params: str) -> Optional[Dict]:
         """
         Make a GET request to the API with error handling
         
         Args:
             params: Query parameters (e.g., "2024/fall/cmpt")
-            
+        
         Returns:
             JSON response as dictionary, or None if request fails
         """
         url = f"{self.BASE_URL}?{params}"
         
         try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(url, timeout=10)
+            response = await self._get(url)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             print(f"Error fetching {url}: {e}")
             return None
     
-    def get_terms(self, year: str) -> List[str]:
+    async def get_terms(self, year: str) -> List[str]:
         """Get available terms for a given year"""
-        data = self._make_request(year)
+        data = await self._make_request(year)
         if data:
             return [term['value'] for term in data]
         return []
     
-    def get_departments(self, year: str, term: str) -> List[str]:
+    async def get_departments(self, year: str, term: str) -> List[str]:
         """Get all departments offering courses in a term"""
-        data = self._make_request(f"{year}/{term}")
+        data = await self._make_request(f"{year}/{term}")
         if data:
             return [dept['value'] for dept in data]
         return []
     
-    def get_courses(self, year: str, term: str, dept: str) -> List[Dict]:
+    async def get_courses(self, year: str, term: str, dept: str) -> List[Dict]:
         """Get all courses for a department in a term"""
-        data = self._make_request(f"{year}/{term}/{dept}")
+        data = await self._make_request(f"{year}/{term}/{dept}")
         if data:
             return data
         return []
     
-    def get_course_sections(self, year: str, term: str, dept: str, course_number: str) -> List[Dict]:
+    async def get_course_sections(self, year: str, term: str, dept: str, course_number: str) -> List[Dict]:
         """Get all sections for a specific course"""
-        data = self._make_request(f"{year}/{term}/{dept}/{course_number}")
+        data = await self._make_request(f"{year}/{term}/{dept}/{course_number}")
         if data:
             return data
         return []
     
-    def get_section_details(self, year: str, term: str, dept: str, 
-                           course_number: str, section: str) -> Optional[Dict]:
+    async def get_section_details(self, year: str, term: str, dept: str, 
+                                  course_number: str, section: str) -> Optional[Dict]:
         """Get detailed information for a specific section"""
-        data = self._make_request(f"{year}/{term}/{dept}/{course_number}/{section}")
-        return data
+        return await self._make_request(f"{year}/{term}/{dept}/{course_number}/{section}")
     
-    def get_enrollment_data(self, year: str, term: str, dept: str, 
-                           course_number: str, section: str) -> Tuple[Optional[str], Optional[str]]:
+    async def get_enrollment_data(self, year: str, term: str, dept: str, 
+                                  course_number: str, section: str) -> Union[Tuple[Optional[str], Optional[str]], Stale]:
         """
-        Fetch enrollment data from CourSys browse/info endpoint
+        Fetch enrollment data from the section's CourSys browse/info page
         
         Returns:
             Tuple of (enrolled/capacity, waitlist) e.g., ("161/331", "5")
-            Returns (None, None) if data cannot be fetched
+            Returns (None, None) if CourSys has no such offering
+            Returns Stale if CourSys could not be reached; keep any previous data
+        """
+        return await self._enrollment_cycle.fetch(build_coursys_id(year, term, dept, course_number, section))
+    
+    async def get_enrollment_many(self, year: str, term: str,
+                                  sections: List[Tuple[str, str, str]]) -> List[Union[Tuple[Optional[str], Optional[str]], Stale]]:
         """
-        # Convert term format: "2025/fall" -> "2025fa"
-        term_map = {
-            'spring': 'sp',
-            'summer': 'su', 
-            'fall': 'fa'
+        Fetch enrollment for many (dept, course_number, section) requests
+        
+        Requests are grouped by CourSys offering, each offering is fetched
+        once, and the result is fanned back out to every section sharing it.
+        
+        Returns:
+            One get_enrollment_data result per request, in the same order
+        """
+        plan = plan_enrollment_requests(year, term, sections)
+        results = await self._enrollment_cycle.fetch_many(plan)
+        
+        by_section = {
+            section: results[offering_id]
+            for offering_id, planned in plan.items()
+            for section in planned
         }
+        return [by_section[section] for section in sections]
+    
+    async def _crawl_section(self, year: str, term: str, dept: str, course_number: str,
+                             section: str, include_enrollment: bool) -> Optional[Dict]:
+        """Fetch one section's details and (optionally) its enrollment concurrently"""
+        unit = section_unit(year, term, dept, course_number, section)
+        if self.journal and self.journal.is_done(unit):
+            return self.journal.payload(unit)
+        
+        enrollment = (None, None)
+        if include_enrollment:
+            details, enrollment = await asyncio.gather(
+                self.get_section_details(year, term, dept, course_number, section),
+                self.get_enrollment_data(year, term, dept, course_number, section)
+            )
+        else:
+            details = await self.get_section_details(year, term, dept, course_number, section)
         
-        term_code = term_map.get(term.lower(), term[:2])
-        year_short = year
+        if not details:
+            return None
         
-        # Convert section format: "D100" -> "d1", "D101" -> "d1", "D200" -> "d2"
-        # Take first letter + first digit only
-        section_code = section.lower()
-        if len(section_code) >= 2:
-            # Extract first letter and first digit (e.g., "d100" -> "d1", "d101" -> "d1")
-            import re
-            match = re.match(r'^([a-z])(\d)', section_code)
-            if match:
-                section_code = match.group(1) + match.group(2)
+        # Stale enrollment leaves the section out of the journal so a resumed crawl retries it
+        stale = isinstance(enrollment, Stale)
+        enrolled, waitlist = (None, None) if stale else enrollment
         
-        # Build CourSys URL
-        coursys_id = f"{year_short}{term_code}-{dept.lower()}-{course_number.lower()}-{section_code}"
-        url = f"{self.COURSYS_URL}/{coursys_id}"
+        if enrolled or waitlist:
+            details['enrollmentData'] = {
+                'enrolled': enrolled,
+                'waitlist': waitlist
+            }
+            print(f"    ✓ {dept.upper()} {course_number} {section}: {enrolled} enrolled" + 
+                  (f", {waitlist} waitlist" if waitlist else ""))
         
-        try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code != 200:
-                return None, None
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            text = soup.get_text()
-            
-            # Extract enrollment: "Enrolment161 out of 331" or "200 out of 200 (39 on waitlist)"
-            enrollment_pattern = r'Enrolment\s*(\d+)\s*out of\s*(\d+)'
-            enrollment_match = re.search(enrollment_pattern, text)
-            
-            enrolled_capacity = None
-            if enrollment_match:
-                enrolled = enrollment_match.group(1)
-                capacity = enrollment_match.group(2)
-                enrolled_capacity = f"{enrolled}/{capacity}"
-            
-            # Extract waitlist: "(39 on waitlist)" or "(15 on waitlist)"
-            waitlist = None
-            waitlist_patterns = [
-                r'\((\d+)\s+on\s+waitlist\)',  # (39 on waitlist) - most common format
-                r'waitlist:\s*(\d+)',           # Waitlist: 15
-                r'(\d+)\s+on\s+waitlist',       # 15 on waitlist (without parens)
+        if self.journal and not stale:
+            self.journal.mark_done(unit, details)
+        
+        return details
+    
+    async def _crawl_course(self, year: str, term: str, dept: str, course_number: str,
+                            include_enrollment: bool) -> List[Dict]:
+        """Fetch all sections of a course concurrently"""
+        unit = course_unit(year, term, dept, course_number)
+        
+        if self.journal and self.journal.is_done(unit):
+            section_codes = self.journal.payload(unit)['sections']
+        else:
+            print(f"  → Fetching {dept.upper()} {course_number}...")
+            sections = await self._make_request(f"{year}/{term}/{dept}/{course_number}")
+            if sections is None:
+                # Listing failed; don't journal the course as complete
+                return []
+            section_codes = [
+                section_info['value'] for section_info in sections
+                if section_info.get('value')
             ]
-            
-            for pattern in waitlist_patterns:
-                waitlist_match = re.search(pattern, text, re.IGNORECASE)
-                if waitlist_match:
-                    waitlist = waitlist_match.group(1)
-                    break
-            
-            return enrolled_capacity, waitlist
-            
-        except Exception as e:
-            print(f"  ⚠️ Could not fetch enrollment from CourSys: {e}")
-            return None, None
-    
-    def crawl_department(self, year: str, term: str, dept: str, include_enrollment: bool = True) -> List[Dict]:
+        
+        results = await asyncio.gather(*[
+            self._crawl_section(year, term, dept, course_number, section, include_enrollment)
+            for section in section_codes
+        ])
+        
+        if self.journal and all(
+            self.journal.is_done(section_unit(year, term, dept, course_number, section))
+            for section in section_codes
+        ):
+            self.journal.mark_done(unit, {'sections': section_codes})
+        
+        return [details for details in results if details]
+    
+    async def crawl_department(self, year: str, term: str, dept: str, include_enrollment: bool = True) -> List[Dict]:
         """
         Crawl all courses and their details for a department
         
@@ -167,41 +239,57 @@ class SFUAPIClient:
         """
         print(f"📚 Crawling {dept.upper()} courses for {term} {year}...")
         
-        courses = self.get_courses(year, term, dept)
-        detailed_courses = []
+        unit = dept_unit(year, term, dept)
         
-        for course in courses:
-            course_number = course.get('value')
-            if not course_number:
-                continue
-            
-            print(f"  → Fetching {dept.upper()} {course_number}...")
-            
-            sections = self.get_course_sections(year, term, dept, course_number)
-            
-            for section_info in sections:
-                section = section_info.get('value')
-                if section:
-                    details = self.get_section_details(year, term, dept, 
-                                                      course_number, section)
-                    if details:
-                        # Add enrollment data if requested
-                        if include_enrollment:
-                            enrolled, waitlist = self.get_enrollment_data(
-                                year, term, dept, course_number, section
-                            )
-                            if enrolled or waitlist:
-                                details['enrollmentData'] = {
-                                    'enrolled': enrolled,
-                                    'waitlist': waitlist
-                                }
-                                print(f"    ✓ {section}: {enrolled} enrolled" + 
-                                     (f", {waitlist} waitlist" if waitlist else ""))
-                        
-                        detailed_courses.append(details)
+        if self.journal and self.journal.is_done(unit):
+            course_numbers = self.journal.payload(unit)['courses']
+        else:
+            courses = await self._make_request(f"{year}/{term}/{dept}")
+            if courses is None:
+                # Listing failed; don't journal the department as complete
+                print(f"✅ Crawled 0 sections from {dept.upper()}")
+                return []
+            course_numbers = [course['value'] for course in courses if course.get('value')]
+        
+        results = await asyncio.gather(*[
+            self._crawl_course(year, term, dept, course_number, include_enrollment)
+            for course_number in course_numbers
+        ])
+        
+        if self.journal and all(
+            self.journal.is_done(course_unit(year, term, dept, course_number))
+            for course_number in course_numbers
+        ):
+            self.journal.mark_done(unit, {'courses': course_numbers})
+        if self.journal:
+            self.journal.flush()
+        
+        detailed_courses = [details for sections in results for details in sections]
         
         print(f"✅ Crawled {len(detailed_courses)} sections from {dept.upper()}")
         return detailed_courses
+    
+    async def crawl_departments(self, targets: List[Tuple[str, str, str]],
+                                include_enrollment: bool = True) -> List[Dict]:
+        """
+        Crawl several (year, term, dept) targets in parallel
+        
+        Enrollment is fetched once per CourSys offering for the whole crawl,
+        so lecture sections sharing an offering cost one request.
+        
+        Returns:
+            All sections, in the order of the targets
+        """
+        self._enrollment_cycle = self.enrollment.cycle()
+        try:
+            results = await asyncio.gather(*[
+                self.crawl_department(year, term, dept, include_enrollment)
+                for year, term, dept in targets
+            ])
+        finally:
+            if self.journal:
+                self.journal.flush()
+        return [details for sections in results for details in sections]
 
 
 def save_courses_to_json(courses: List[Dict], filename: str):
@@ -2,20 +2,31 @@
 Test script for SFU API Crawler
 Fetches CMPT courses and saves them to JSON
 """
-from sfu_api_client import SFUAPIClient, save_courses_to_json
+import asyncio
 import os
+import sys
+from pathlib import Path
 
+# Add the backend directory to path so the shared services are importable
+# when this script is run from the crawler directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def main():
+from sfu_api_client import AsyncSFUAPIClient, save_courses_to_json
+from services.http_client import close_http_client
+
+
+async def main():
     os.makedirs('../data', exist_ok=True)
     
-    client = SFUAPIClient(rate_limit_delay=0.3)
+    client = AsyncSFUAPIClient()
     
     print("🔍 Discovering available terms...\n")
     
+    years = ["2025", "2024", "2023"]
+    terms_by_year = await asyncio.gather(*[client.get_terms(year) for year in years])
+    
     available_data = []
-    for year in ["2025", "2024", "2023"]:
-        terms = client.get_terms(year)
+    for year, terms in zip(years, terms_by_year):
         if terms:
             print(f"✅ {year}: {', '.join(terms)}")
             available_data.append((year, terms[0]))
@@ -24,6 +35,7 @@ def main():
     
     if not available_data:
         print("\n❌ No available data found!")
+        await close_http_client()
         return
     
     YEAR, TERM = available_data[0]
@@ -33,11 +45,13 @@ def main():
     print(f"📅 Target: {TERM.upper()} {YEAR}")
     print(f"🏢 Departments: {', '.join([d.upper() for d in DEPARTMENTS])}\n")
     
-    all_courses = []
-    
-    for dept in DEPARTMENTS:
-        courses = client.crawl_department(YEAR, TERM, dept)
-        all_courses.extend(courses)
+    # Crawl all departments in parallel
+    try:
+        all_courses = await client.crawl_departments(
+            [(YEAR, TERM, dept) for dept in DEPARTMENTS]
+        )
+    finally:
+        await close_http_client()
     
     if all_courses:
         output_file = f"../data/{TERM}_{YEAR}_courses.json"
@@ -53,4 +67,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
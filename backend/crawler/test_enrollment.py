@@ -2,21 +2,32 @@
 """
 Test script to fetch courses with enrollment data for multiple departments
 """
-from sfu_api_client import SFUAPIClient, save_courses_to_json
+import asyncio
+import sys
+from pathlib import Path
 
-def main():
-    client = SFUAPIClient(rate_limit_delay=0.3)
+# Add the backend directory to path so the shared services are importable
+# when this script is run from the crawler directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sfu_api_client import AsyncSFUAPIClient, save_courses_to_json
+from services.http_client import close_http_client
+
+async def main():
+    client = AsyncSFUAPIClient()
     
     departments = ['cmpt', 'math', 'macm', 'stat']
-    all_courses = []
     
     print(f"Fetching enrollment data for {', '.join([d.upper() for d in departments])} courses...\n")
     
-    for dept in departments:
-        print(f"📚 Crawling {dept.upper()} courses...")
-        courses = client.crawl_department('2025', 'fall', dept, include_enrollment=True)
-        all_courses.extend(courses)
-        print(f"✅ Added {len(courses)} {dept.upper()} sections\n")
+    # Crawl all departments in parallel
+    try:
+        all_courses = await client.crawl_departments(
+            [('2025', 'fall', dept) for dept in departments],
+            include_enrollment=True
+        )
+    finally:
+        await close_http_client()
     
     # Save to file
     if all_courses:
@@ -44,4 +55,4 @@ def main():
         print("❌ No courses found!")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
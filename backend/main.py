@@ -10,7 +10,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from database import create_db_and_tables
-from routers import courses, validation, watchers, auth, user, prerequisites, professors
+from routers import courses, validation, watchers, auth, user, prerequisites, professors, live
+from services.http_client import get_http_client, close_http_client
+from services.event_bus import start_event_bus, stop_event_bus
+from services.notifications import start_dispatcher, stop_dispatcher
 from services.worker import start_worker, stop_worker
 
 # Configure logging
@@ -34,16 +37,30 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     create_db_and_tables()
     logger.info("Database tables created")
     
-    # Start background worker
-    start_worker()
-    logger.info("Background worker started")
+    # Open the shared pooled HTTP client used by the crawler and worker
+    get_http_client()
+    
+    # Live seat updates for SSE and WebSocket clients
+    await start_event_bus()
+    
+    # Start alert delivery, then the background worker that queues alerts.
+    # API replicas skip the worker when it runs separately (worker.py).
+    start_dispatcher()
+    if settings.RUN_WORKER_IN_API:
+        start_worker()
+        logger.info("Background worker started")
     
     yield
     
     # Shutdown
     logger.info("Shutting down SFU Scheduler API...")
-    stop_worker()
-    logger.info("Background worker stopped")
+    if settings.RUN_WORKER_IN_API:
+        stop_worker()
+        logger.info("Background worker stopped")
+    
+    await stop_dispatcher()
+    await stop_event_bus()
+    await close_http_client()
 
 
 # Create FastAPI app
@@ -71,6 +88,7 @@ app.include_router(validation.router, prefix=settings.API_V1_PREFIX)
 app.include_router(watchers.router, prefix=settings.API_V1_PREFIX)
 app.include_router(prerequisites.router, prefix=settings.API_V1_PREFIX)
 app.include_router(professors.router, prefix=settings.API_V1_PREFIX)
+app.include_router(live.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
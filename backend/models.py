@@ -3,7 +3,7 @@ Database models for the SFU Scheduler.
 """
 from typing import Optional, Any
 from datetime import datetime
-from sqlmodel import Field, SQLModel, Relationship, Column, JSON
+from sqlmodel import Field, SQLModel, Relationship, Column, JSON, Index
 
 
 class Course(SQLModel, table=True):
@@ -115,6 +115,107 @@ class User(SQLModel, table=True):
         return f"<User {self.id}: {self.email}>"
 
 
+class CrawlCacheEntry(SQLModel, table=True):
+    """Crawl cache table - HTTP validators and content hash per crawled URL."""
+    
+    __tablename__ = "crawl_cache"
+    
+    url: str = Field(primary_key=True, description="Upstream URL")
+    etag: Optional[str] = Field(default=None, description="Last ETag response header")
+    last_modified: Optional[str] = Field(default=None, description="Last Last-Modified response header")
+    content_hash: str = Field(description="SHA-256 of the last response body")
+    checked_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<CrawlCacheEntry {self.url}>"
+
+
+class CrawlJournalEntry(SQLModel, table=True):
+    """Crawl journal table - Completed crawl units, used to resume interrupted crawls."""
+    
+    __tablename__ = "crawl_journal"
+    
+    crawl_id: str = Field(primary_key=True, description="Crawl identifier (e.g., 'outlines:2026/spring')")
+    unit: str = Field(primary_key=True, description="Completed unit (e.g., 'course:CMPT/276')")
+    payload: Optional[dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSON),
+        description="Result of the unit, replayed on resume"
+    )
+    completed_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<CrawlJournalEntry {self.crawl_id} {self.unit}>"
+
+
+class SectionCheckState(SQLModel, table=True):
+    """Section check state table - When each watched section was last checked and last changed."""
+    
+    __tablename__ = "section_check_state"
+    
+    section_id: int = Field(foreign_key="sections.id", primary_key=True)
+    last_checked_at: Optional[datetime] = Field(default=None, description="Last successful seat check")
+    last_changed_at: Optional[datetime] = Field(default=None, description="Last check that saw different counts")
+    checks: int = Field(default=0, description="Successful seat checks")
+    changes: int = Field(default=0, description="Checks that saw different counts")
+    interval_seconds: Optional[float] = Field(default=None, description="Current polling interval")
+    next_check_at: Optional[datetime] = Field(default=None, index=True, description="When the section is next due")
+    recorded_seats: Optional[dict] = Field(
+        default=None,
+        sa_column=Column(JSON),
+        description="Counts the seat history last recorded, which its next delta is taken from"
+    )
+    deltas_since_keyframe: int = Field(default=0, description="Seat history deltas recorded since its last keyframe")
+    
+    def __repr__(self) -> str:
+        return f"<SectionCheckState {self.section_id}>"
+
+
+class SectionSeatHistory(SQLModel, table=True):
+    """
+    Seat history table - One row per observed change in a section's counts.
+    
+    Keyframe rows hold absolute counts; the rows after a keyframe hold
+    only the change (delta) in each count, which is usually small.
+    """
+    
+    __tablename__ = "section_seat_history"
+    __table_args__ = (
+        Index("ix_section_seat_history_section_time", "section_id", "recorded_at"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    section_id: int = Field(foreign_key="sections.id")
+    recorded_at: datetime = Field(default_factory=datetime.utcnow)
+    keyframe: bool = Field(default=False, description="Counts are absolute rather than deltas")
+    seats_total: int = Field(default=0)
+    seats_enrolled: int = Field(default=0)
+    waitlist_total: int = Field(default=0)
+    waitlist_enrolled: int = Field(default=0)
+    
+    def __repr__(self) -> str:
+        return f"<SectionSeatHistory {self.section_id} @ {self.recorded_at}>"
+
+
+class WorkerLease(SQLModel, table=True):
+    """
+    Worker lease table - Which worker process owns a shard of the seat checks.
+    
+    A lease is held until expires_at and must be renewed before then;
+    an expired lease can be taken by any worker.
+    """
+    
+    __tablename__ = "worker_leases"
+    
+    name: str = Field(primary_key=True, description="e.g. 'seat-shard-0'")
+    holder: str = Field(default="", description="Worker id: host:pid:random")
+    expires_at: datetime = Field(default_factory=datetime.utcnow)
+    acquired_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<WorkerLease {self.name} held by {self.holder or 'nobody'}>"
+
+
 # Pydantic models for API requests/responses
 
 class CourseRead(SQLModel):
@@ -9,8 +9,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlmodel import Session, select, or_, and_
 
 from database import get_session
-from crawler.sfu_api_client import SFUAPIClient
+from crawler.sfu_api_client import AsyncSFUAPIClient
 from models import Course, Section, CourseRead, SectionRead, SectionWithCourse
+from services.enrollment_source import get_enrollment_source
+from services.resilience import Stale
+from services.seat_history import load_history
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
@@ -195,12 +198,65 @@ async def get_section(
     }
 
 
+@router.get("/section/{section_id}/history")
+async def get_section_history(
+    section_id: int,
+    since: Optional[datetime] = Query(None, description="Only changes at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only changes at or before this time (UTC)"),
+    session: Session = Depends(get_session)
+) -> dict[str, Any]:
+    """
+    Get a section's seat counts over time, one point per recorded change.
+    
+    Example: GET /api/v1/courses/section/123/history?since=2026-01-01T00:00:00
+    """
+    if not session.get(Section, section_id):
+        raise HTTPException(status_code=404, detail=f"Section {section_id} not found")
+    
+    points = load_history(session, section_id, since, until)
+    for point in points:
+        point["seats_available"] = max(0, point["seats_total"] - point["seats_enrolled"])
+    
+    return {
+        "section_id": section_id,
+        "points": points
+    }
+
+
+def _last_known_enrollment(
+    session: Session,
+    dept: str,
+    number: str,
+    section: str,
+    term: str
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    Enrollment last stored for a section, used when CourSys is unreachable.
+    
+    Returns:
+        Tuple of (enrolled/capacity, waitlist), or (None, None) if unknown
+    """
+    year, season = term.split('/')
+    stored = session.exec(
+        select(Section).where(
+            Section.course_id == f"{dept.upper()}-{number.upper()}",
+            Section.section_code == section.upper(),
+            Section.term == f"{season.capitalize()} {year}"
+        )
+    ).first()
+    
+    if not stored:
+        return None, None
+    return f"{stored.seats_enrolled}/{stored.seats_total}", str(stored.waitlist_enrolled)
+
+
 @router.get("/enrollment/{dept}/{number}/{section}")
 async def get_live_enrollment(
     dept: str,
     number: str,
     section: str,
-    term: Optional[str] = Query("2025/fall", description="Term in format YYYY/season")
+    term: Optional[str] = Query("2025/fall", description="Term in format YYYY/season"),
+    session: Session = Depends(get_session)
 ) -> dict[str, Any]:
     """
     Fetch live enrollment data from CourSys in real-time.
@@ -214,16 +270,25 @@ async def get_live_enrollment(
             "section": "D100",
             "enrolled": "150/150",
             "waitlist": "5",
-            "timestamp": "2025-11-25T10:30:00"
+            "timestamp": "2025-11-25T10:30:00",
+            "stale": false
         }
+    
+    If CourSys can't be reached the last stored counts are returned with
+    "stale": true.
     """
-    client = SFUAPIClient(rate_limit_delay=0.1)
+    client = AsyncSFUAPIClient(enrollment=get_enrollment_source())
     
     # Parse term format
     year, season = term.split('/')
     
     # Fetch enrollment data
-    enrolled, waitlist = client.get_enrollment_data(year, season, dept.lower(), number.lower(), section)
+    enrollment = await client.get_enrollment_data(year, season, dept.lower(), number.lower(), section)
+    
+    stale = isinstance(enrollment, Stale)
+    if stale:
+        enrollment = _last_known_enrollment(session, dept, number, section, term)
+    enrolled, waitlist = enrollment
     
     return {
         "dept": dept.upper(),
@@ -232,14 +297,16 @@ async def get_live_enrollment(
         "enrolled": enrolled or "N/A",
         "waitlist": waitlist or "0",
         "timestamp": datetime.utcnow().isoformat(),
-        "term": term
+        "term": term,
+        "stale": stale
     }
 
 
 @router.post("/enrollment/batch")
 async def get_batch_enrollment(
     courses: list[dict[str, str]] = Body(..., description="List of course sections"),
-    term: Optional[str] = Query("2025/fall", description="Term in format YYYY/season")
+    term: Optional[str] = Query("2025/fall", description="Term in format YYYY/season"),
+    session: Session = Depends(get_session)
 ) -> list[dict[str, Any]]:
     """
     Fetch live enrollment data for multiple courses at once.
@@ -252,25 +319,27 @@ async def get_batch_enrollment(
     
     Returns: List of enrollment data for each course
     """
-    from crawler.sfu_api_client import SFUAPIClient
-    from datetime import datetime
-    import asyncio
-    
-    client = SFUAPIClient(rate_limit_delay=0.2)
+    client = AsyncSFUAPIClient(enrollment=get_enrollment_source())
     year, season = term.split('/')
     
-    results = []
-    
-    # Fetch enrollment for each course
+    requested = []
     for course in courses:
         dept = course.get('dept', '').lower()
         number = course.get('number', '').lower()
         section = course.get('section', '').upper()
         
-        if not (dept and number and section):
-            continue
-        
-        enrolled, waitlist = client.get_enrollment_data(year, season, dept, number, section)
+        if dept and number and section:
+            requested.append((dept, number, section))
+    
+    # Sections sharing a CourSys offering (D100, D101 -> d1) are fetched once
+    enrollments = await client.get_enrollment_many(year, season, requested)
+    
+    results = []
+    for (dept, number, section), enrollment in zip(requested, enrollments):
+        stale = isinstance(enrollment, Stale)
+        if stale:
+            enrollment = _last_known_enrollment(session, dept, number, section, term)
+        enrolled, waitlist = enrollment
         
         results.append({
             "dept": dept.upper(),
@@ -278,10 +347,8 @@ async def get_batch_enrollment(
             "section": section,
             "enrolled": enrolled or "N/A",
             "waitlist": waitlist or "0",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow().isoformat(),
+            "stale": stale
         })
-        
-        # Small delay between requests
-        await asyncio.sleep(0.2)
     
     return results
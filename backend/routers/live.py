@@ -0,0 +1,149 @@
+"""
+Live seat update routes (Server-Sent Events and WebSocket).
+
+Clients subscribe to section ids and get the current counts once, then one
+small JSON message per change found by the seat worker, instead of polling
+the enrollment endpoints (each poll of which scrapes upstream).
+"""
+import asyncio
+import json
+from typing import AsyncGenerator, Iterable
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+
+from database import engine
+from models import Section
+from services.seat_events import MAX_SECTIONS_PER_SUBSCRIBER, SeatChange, Subscriber, get_event_hub
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+# Seconds between keep-alive messages on an idle SSE stream
+HEARTBEAT_SECONDS = 15
+
+BAD_MESSAGE = 'Expected {"subscribe": [section ids]} or {"unsubscribe": [section ids]}'
+
+
+def _parse_section_ids(value: str) -> list[int]:
+    try:
+        section_ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="sections must be comma-separated section ids")
+    
+    if len(section_ids) > MAX_SECTIONS_PER_SUBSCRIBER:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_SECTIONS_PER_SUBSCRIBER} sections per subscription"
+        )
+    return section_ids
+
+
+def _snapshot(section_ids: Iterable[int]) -> list[SeatChange]:
+    """Current counts for the sections, read in one short query."""
+    section_ids = list(section_ids)
+    if not section_ids:
+        return []
+    
+    with Session(engine) as session:
+        sections = session.exec(select(Section).where(Section.id.in_(section_ids))).all()
+    
+    return [
+        SeatChange(
+            section_id=section.id,
+            seats_total=section.seats_total,
+            seats_enrolled=section.seats_enrolled,
+            waitlist_total=section.waitlist_total,
+            waitlist_enrolled=section.waitlist_enrolled,
+            at=section.updated_at.isoformat(timespec="seconds")
+        )
+        for section in sections
+    ]
+
+
+@router.get("/seats")
+async def stream_seat_changes(
+    request: Request,
+    sections: str = Query(..., description="Comma-separated section ids, e.g. '12,15,40'")
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of seat changes for the given sections.
+    
+    Sends a "snapshot" event per section with its current counts, then a
+    "seat" event whenever the worker sees its counts change.
+    
+    Example: GET /api/v1/live/seats?sections=123,124
+    """
+    section_ids = _parse_section_ids(sections)
+    
+    async def events() -> AsyncGenerator[str, None]:
+        # Subscribed only once the stream runs, so a response that is never
+        # started leaves nothing behind; subscribing before the snapshot
+        # means no change between the two is missed
+        hub = get_event_hub()
+        subscriber = Subscriber()
+        hub.subscribe(subscriber, section_ids)
+        try:
+            for change in await asyncio.to_thread(_snapshot, section_ids):
+                yield f"event: snapshot\ndata: {change.to_json()}\n\n"
+            
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line; keeps proxies from closing an idle stream
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: seat\ndata: {payload}\n\n"
+        finally:
+            hub.remove(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/seats/ws")
+async def seat_changes_socket(websocket: WebSocket) -> None:
+    """
+    WebSocket stream of seat changes.
+    
+    Send {"subscribe": [123, 124]} or {"unsubscribe": [123]} at any time.
+    Each newly subscribed section is answered with its current counts;
+    after that every message is a seat change for a subscribed section.
+    """
+    await websocket.accept()
+    hub = get_event_hub()
+    subscriber = Subscriber()
+    
+    async def receive() -> None:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                subscribe = [int(section_id) for section_id in message.get("subscribe", [])]
+                unsubscribe = [int(section_id) for section_id in message.get("unsubscribe", [])]
+            except (ValueError, TypeError, AttributeError):
+                await websocket.send_text(json.dumps({"error": BAD_MESSAGE}))
+                continue
+            
+            hub.unsubscribe(subscriber, unsubscribe)
+            added = hub.subscribe(subscriber, subscribe)
+            for change in await asyncio.to_thread(_snapshot, added):
+                subscriber.deliver(change.to_json())
+    
+    async def send() -> None:
+        while True:
+            await websocket.send_text(await subscriber.queue.get())
+    
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        # Either side ends the connection: the client disconnected
+        # (receive raises) or a send failed
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        hub.remove(subscriber)
@@ -2,11 +2,15 @@
 API endpoints for fetching course prerequisites from CourSys
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import requests
 import re
 from typing import Optional
 
+from config import settings
+from services.rate_limiter import throttle
+
 router = APIRouter(prefix="/prerequisites", tags=["prerequisites"])
 
 class PrerequisiteResponse(BaseModel):
@@ -50,10 +54,11 @@ async def get_prerequisite(dept: str, number: str, term: str = "2025fa"):
     # For the first section (typically D1 or D100 -> d1)
     section_code = "d1"
     
-    url = f"https://coursys.sfu.ca/browse/info/{term}-{dept.lower()}-{number.lower()}-{section_code}?data=yes"
+    url = f"{settings.COURSYS_BASE_URL}/browse/info/{term}-{dept.lower()}-{number.lower()}-{section_code}?data=yes"
     
     try:
-        response = requests.get(url, timeout=10)
+        await throttle(url)
+        response = await run_in_threadpool(requests.get, url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             descrlong = data.get('descrlong', '')
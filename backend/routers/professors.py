@@ -2,6 +2,7 @@
 Professor rating endpoints
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 import sys
 from pathlib import Path
@@ -21,7 +22,9 @@ async def get_rating(professor_name: str):
     Searches RMP using their GraphQL API and returns the first result
     """
     try:
-        rating_data = get_professor_rating(professor_name)
+        # Run in a thread so the blocking client and its rate limit wait
+        # don't stall the event loop
+        rating_data = await run_in_threadpool(get_professor_rating, professor_name)
         
         if not rating_data:
             return {
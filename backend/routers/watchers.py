@@ -7,6 +7,7 @@ from sqlmodel import Session, select
 
 from database import get_session
 from models import Watcher, WatcherCreate, WatcherRead, Section
+from services.notifications import get_dispatcher
 from services.worker import get_worker
 
 router = APIRouter(prefix="/watchers", tags=["watchers"])
@@ -177,3 +178,26 @@ async def get_watcher_stats(
         "unique_sections_watched": sections_watched,
         "unique_users": unique_users
     }
+
+
+@router.get("/worker/metrics", response_model=dict[str, Any])
+async def get_worker_metrics() -> dict[str, Any]:
+    """
+    Recent seat check cycles in this process: how late each started, how
+    overdue its sections were, upstream latency and DB write time.
+    
+    Only covers the worker in this process; separate worker processes
+    (worker.py) log the same record once per cycle.
+    
+    Example: GET /api/v1/watchers/worker/metrics
+    """
+    worker = get_worker()
+    
+    return {
+        "running": worker.is_running,
+        "worker_id": worker.coordinator.holder,
+        "shards": sorted(worker.coordinator.owned),
+        "total_shards": worker.coordinator.shards,
+        **worker.metrics.summary(),
+        "notifications": get_dispatcher().stats
+    }
@@ -0,0 +1,144 @@
+"""
+Crawler Benchmark Script.
+Runs SFUCrawler against a local fake outlines upstream with simulated
+latency, comparing different in-flight request limits.
+"""
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from config import settings
+from services.crawler import SFUCrawler
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def make_fake_upstream(
+    departments: list[str],
+    courses_per_dept: int,
+    sections_per_course: int,
+    latency: float
+) -> httpx.MockTransport:
+    """
+    Build a transport that answers outlines API URLs from memory.
+    
+    "?{term}/{dept}" returns the course list; "?{term}/{dept}/{number}"
+    returns a course outline with its sections.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        
+        parts = request.url.query.decode().split("/")
+        
+        if len(parts) == 3 and parts[2].upper() in departments:
+            return httpx.Response(200, json=[
+                {"value": str(100 + i), "text": str(100 + i)}
+                for i in range(courses_per_dept)
+            ])
+        
+        if len(parts) == 4:
+            dept, number = parts[2], parts[3]
+            return httpx.Response(200, json={
+                "title": f"{dept} {number}",
+                "description": "Benchmark course",
+                "units": "3",
+                "prerequisites": "",
+                "courseSchedule": [
+                    {
+                        "sectionCode": f"D{100 + j}",
+                        "enrollmentCap": 100,
+                        "enrollmentTotal": 50,
+                        "schedule": [
+                            {"day": "Mo", "startTime": "10:30", "endTime": "11:20"}
+                        ]
+                    }
+                    for j in range(sections_per_course)
+                ]
+            })
+        
+        return httpx.Response(404)
+    
+    return httpx.MockTransport(handler)
+
+
+async def run_benchmark(
+    concurrency_limit: int,
+    departments: list[str],
+    courses_per_dept: int,
+    sections_per_course: int,
+    latency: float,
+    term: str = "2026/spring"
+) -> dict[str, float]:
+    """Run one crawl and return timing stats."""
+    transport = make_fake_upstream(departments, courses_per_dept, sections_per_course, latency)
+    client = httpx.AsyncClient(transport=transport)
+    
+    async with SFUCrawler(client=client, concurrency_limit=concurrency_limit) as crawler:
+        start = time.perf_counter()
+        courses = await crawler.crawl_all_courses(departments, term)
+        elapsed = time.perf_counter() - start
+        requests = crawler.progress.requests
+    
+    return {
+        "courses": len(courses),
+        "sections": sum(len(c["sections"]) for c in courses),
+        "requests": requests,
+        "elapsed": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else 0.0
+    }
+
+
+async def main(
+    limits: list[int],
+    num_departments: int,
+    courses_per_dept: int,
+    sections_per_course: int,
+    latency_ms: float
+) -> None:
+    departments = [f"D{i:03d}" for i in range(num_departments)]
+    latency = latency_ms / 1000
+    
+    # Measure concurrency alone; the fake upstream needs no politeness limit
+    settings.OUTLINES_RATE_LIMIT = 0
+    
+    print(
+        f"Fake upstream: {num_departments} departments x {courses_per_dept} courses "
+        f"x {sections_per_course} sections, {latency_ms:.0f}ms latency\n"
+    )
+    print(f"{'limit':>6} {'courses':>8} {'sections':>9} {'requests':>9} {'seconds':>8} {'req/s':>8}")
+    
+    for limit in limits:
+        stats = await run_benchmark(
+            limit, departments, courses_per_dept, sections_per_course, latency
+        )
+        print(
+            f"{limit:>6} {stats['courses']:>8} {stats['sections']:>9} {stats['requests']:>9} "
+            f"{stats['elapsed']:>8.2f} {stats['requests_per_second']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    arg_parser = argparse.ArgumentParser(description="Benchmark the crawler against a fake upstream")
+    arg_parser.add_argument("--limits", nargs="+", type=int, default=[1, 5, 20, 50],
+                            help="In-flight request limits to compare")
+    arg_parser.add_argument("--departments", type=int, default=14)
+    arg_parser.add_argument("--courses", type=int, default=40, help="Courses per department")
+    arg_parser.add_argument("--sections", type=int, default=3, help="Sections per course")
+    arg_parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated upstream latency")
+    
+    args = arg_parser.parse_args()
+    
+    asyncio.run(main(args.limits, args.departments, args.courses, args.sections, args.latency_ms))
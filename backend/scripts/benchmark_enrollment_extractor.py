@@ -0,0 +1,154 @@
+"""
+Enrollment Extractor Benchmark.
+Checks services.enrollment_extractor against the golden CourSys pages in
+data/coursys_pages (and against the BeautifulSoup parser it replaced),
+then compares CPU time per page.
+
+Exits non-zero if any golden page gives the wrong answer.
+
+Usage:
+    python scripts/benchmark_enrollment_extractor.py --iterations 200
+"""
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bs4 import BeautifulSoup
+
+from services.enrollment_source import build_coursys_id
+from scripts.upstream_standin import StandinConfig, SyntheticUpstream
+from services.enrollment_extractor import extract_enrollment, extract_seat_counts
+
+PAGES_DIR = Path(__file__).parent.parent / "data" / "coursys_pages"
+
+
+def soup_enrollment(html: str) -> tuple[Optional[str], Optional[str]]:
+    """The previous full-document parser, kept as a reference."""
+    text = BeautifulSoup(html, 'html.parser').get_text()
+    
+    enrolled_capacity = None
+    enrollment_match = re.search(r'Enrolment\s*(\d+)\s*out of\s*(\d+)', text)
+    if enrollment_match:
+        enrolled_capacity = f"{enrollment_match.group(1)}/{enrollment_match.group(2)}"
+    
+    waitlist = None
+    for pattern in (r'\((\d+)\s+on\s+waitlist\)', r'waitlist:\s*(\d+)', r'(\d+)\s+on\s+waitlist'):
+        waitlist_match = re.search(pattern, text, re.IGNORECASE)
+        if waitlist_match:
+            waitlist = waitlist_match.group(1)
+            break
+    
+    return enrolled_capacity, waitlist
+
+
+def soup_seat_counts(html: str) -> Optional[dict[str, int]]:
+    """The previous seat page parser, kept as a reference."""
+    enrollment_section = BeautifulSoup(html, 'html.parser').find('div', class_='enrollment')
+    if not enrollment_section:
+        return None
+    
+    text = enrollment_section.get_text()
+    enrolled_match = re.search(r'Enrolled:\s*(\d+)/(\d+)', text)
+    if not enrolled_match:
+        return None
+    
+    seats_data = {
+        'seats_total': int(enrolled_match.group(2)),
+        'seats_enrolled': int(enrolled_match.group(1)),
+        'waitlist_total': 0,
+        'waitlist_enrolled': 0
+    }
+    waitlist_match = re.search(r'Waitlist:\s*(\d+)/(\d+)', text)
+    if waitlist_match:
+        seats_data['waitlist_enrolled'] = int(waitlist_match.group(1))
+        seats_data['waitlist_total'] = int(waitlist_match.group(2))
+    return seats_data
+
+
+def check_golden_pages() -> int:
+    """Compare both parsers with the expected values. Returns the failure count."""
+    with open(PAGES_DIR / "expected.json", "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    
+    failures = 0
+    print("Golden pages")
+    
+    for name, case in expected.items():
+        html = (PAGES_DIR / name).read_text(encoding="utf-8")
+        
+        if case["kind"] == "coursys":
+            want = (case["enrolled"], case["waitlist"])
+            results = {"extractor": extract_enrollment(html), "soup": soup_enrollment(html)}
+        else:
+            want = case["seats"]
+            results = {"extractor": extract_seat_counts(html), "soup": soup_seat_counts(html)}
+        
+        for parser, got in results.items():
+            if got != want:
+                failures += 1
+                print(f"  FAIL {name} ({parser}): expected {want}, got {got}")
+        if results["extractor"] == want:
+            print(f"  ok   {name}")
+    
+    return failures
+
+
+def time_per_page(parse: Callable[[str], object], pages: list[str], iterations: int) -> float:
+    """Mean seconds per page."""
+    start = time.process_time()
+    for _ in range(iterations):
+        for html in pages:
+            parse(html)
+    return (time.process_time() - start) / (iterations * len(pages))
+
+
+def main(iterations: int, page_kb: int) -> int:
+    failures = check_golden_pages()
+    
+    coursys_pages = [
+        (PAGES_DIR / name).read_text(encoding="utf-8")
+        for name in ("2025fa-cmpt-120-d1.html", "2025fa-math-100-d1.html", "2025fa-stat-270-d1.html")
+    ]
+    
+    # Full-size pages with navigation boilerplate, as served by the stand-in
+    upstream = SyntheticUpstream(StandinConfig(page_padding_kb=page_kb))
+    sections = list(upstream.details)[:5]
+    padded_pages = [upstream.coursys_page(build_coursys_id(*section)) for section in sections]
+    seat_pages = [upstream.seat_page(*section) for section in sections]
+    
+    print(f"\nCPU time per page ({iterations} iterations)")
+    print(f"{'pages':<28} {'soup ms':>9} {'extractor ms':>13} {'speedup':>8}")
+    
+    for label, pages, soup_parse, fast_parse in (
+        ("golden CourSys pages", coursys_pages, soup_enrollment, extract_enrollment),
+        (f"CourSys pages (+{page_kb}KB)", padded_pages, soup_enrollment, extract_enrollment),
+        (f"seat pages (+{page_kb}KB)", seat_pages, soup_seat_counts, extract_seat_counts),
+    ):
+        soup_time = time_per_page(soup_parse, pages, max(1, iterations // 10))
+        fast_time = time_per_page(fast_parse, pages, iterations)
+        print(
+            f"{label:<28} {soup_time * 1000:>9.3f} {fast_time * 1000:>13.4f} "
+            f"{soup_time / fast_time if fast_time else float('inf'):>7.0f}x"
+        )
+    
+    if failures:
+        print(f"\n{failures} golden page check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    arg_parser = argparse.ArgumentParser(description="Check and benchmark the CourSys enrollment extractor")
+    arg_parser.add_argument("--iterations", type=int, default=200)
+    arg_parser.add_argument("--page-kb", type=int, default=30, help="Boilerplate size of the full-size pages")
+    
+    args = arg_parser.parse_args()
+    
+    sys.exit(main(args.iterations, args.page_kb))
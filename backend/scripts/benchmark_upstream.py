@@ -0,0 +1,214 @@
+"""
+End-to-end Upstream Benchmark.
+Starts the upstream stand-in on a local port and measures crawl
+throughput (AsyncSFUAPIClient) and seat-check throughput (the worker's
+SFUCrawler.fetch_seat_count and the CourSys enrollment lookup) against it
+over real HTTP.
+
+Usage:
+    python scripts/benchmark_upstream.py --latency-ms 80 --limits 5 20
+    python scripts/benchmark_upstream.py --error-rate 0.05 --standin-rate-limit 50
+"""
+import asyncio
+import contextlib
+import io
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import uvicorn
+
+from config import settings
+from crawler.sfu_api_client import AsyncSFUAPIClient
+from scripts.upstream_standin import StandinConfig, create_app
+from services.crawler import SFUCrawler
+from services.http_client import close_http_client
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+@contextlib.asynccontextmanager
+async def run_standin(config: StandinConfig, port: int):
+    """Serve the stand-in in this event loop for the duration of the block."""
+    app = create_app(config)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    
+    while not server.started:
+        await asyncio.sleep(0.05)
+    
+    try:
+        yield app
+    finally:
+        server.should_exit = True
+        await task
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def bench_crawl(base: str, targets: list[tuple[str, str, str]], limit: int, app) -> dict[str, float]:
+    """Crawl the targets with AsyncSFUAPIClient."""
+    client = AsyncSFUAPIClient(
+        concurrency_limit=limit,
+        base_url=f"{base}/bin/wcm/course-outlines",
+        coursys_url=f"{base}/browse/info"
+    )
+    
+    before = app.state.stats["requests"]
+    start = time.perf_counter()
+    # The client reports every section on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        sections = await client.crawl_departments(targets)
+    elapsed = time.perf_counter() - start
+    requests = app.state.stats["requests"] - before
+    
+    return {
+        "sections": len(sections),
+        "with_enrollment": sum(1 for s in sections if s.get("enrollmentData")),
+        "requests": requests,
+        "elapsed": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else 0.0
+    }
+
+
+async def bench_seat_checks(
+    base: str,
+    sections: list[tuple[str, str, str, str, str]],
+    limit: int
+) -> dict[str, float]:
+    """Check every section once via the worker path and the CourSys path."""
+    settings.SFU_COURYS_BASE_URL = base
+    crawler = SFUCrawler(concurrency_limit=limit)
+    coursys = AsyncSFUAPIClient(concurrency_limit=limit, coursys_url=f"{base}/browse/info")
+    results = {}
+    
+    async def timed(coro, latencies: list[float]):
+        start = time.perf_counter()
+        result = await coro
+        latencies.append(time.perf_counter() - start)
+        return result
+    
+    # Worker path: SFUCrawler.fetch_seat_count
+    latencies: list[float] = []
+    start = time.perf_counter()
+    counts = await asyncio.gather(*[
+        timed(crawler.fetch_seat_count(dept, number, section, f"{year}/{season}"), latencies)
+        for year, season, dept, number, section in sections
+    ])
+    elapsed = time.perf_counter() - start
+    results["worker"] = {
+        "checks": len(counts),
+        "ok": sum(1 for c in counts if c),
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(latencies, 95)
+    }
+    
+    # Live route path: AsyncSFUAPIClient.get_enrollment_data
+    latencies = []
+    start = time.perf_counter()
+    pairs = await asyncio.gather(*[
+        timed(coursys.get_enrollment_data(year, season, dept, number, section), latencies)
+        for year, season, dept, number, section in sections
+    ])
+    elapsed = time.perf_counter() - start
+    results["coursys"] = {
+        "checks": len(pairs),
+        "ok": sum(1 for p in pairs if p and p[0]),
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(latencies, 95)
+    }
+    
+    return results
+
+
+async def main(args) -> None:
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.standin_rate_limit,
+        churn=args.churn,
+        page_padding_kb=args.page_kb
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    
+    # Both upstreams resolve to 127.0.0.1 and so share one client-side limiter
+    settings.OUTLINES_RATE_LIMIT = args.client_rate_limit
+    settings.COURSYS_RATE_LIMIT = args.client_rate_limit
+    
+    async with run_standin(config, args.port) as app:
+        upstream = app.state.upstream
+        targets = sorted({(year, season, dept) for year, season, dept in upstream.courses})
+        if args.departments:
+            wanted = {d.lower() for d in args.departments}
+            targets = [t for t in targets if t[2] in wanted]
+        sections = sorted(k for k in upstream.details if k[:3] in set(targets))
+        
+        print(
+            f"Stand-in: {len(targets)} departments, {len(sections)} sections, "
+            f"{args.latency_ms:.0f}±{args.jitter_ms:.0f}ms latency, "
+            f"{args.error_rate:.0%} errors, client rate limit "
+            f"{args.client_rate_limit or 'off'}\n"
+        )
+        
+        print("Crawl (AsyncSFUAPIClient.crawl_departments)")
+        print(f"{'limit':>6} {'sections':>9} {'enrolled':>9} {'requests':>9} {'seconds':>8} {'req/s':>8}")
+        for limit in args.limits:
+            stats = await bench_crawl(base, targets, limit, app)
+            print(
+                f"{limit:>6} {stats['sections']:>9} {stats['with_enrollment']:>9} {stats['requests']:>9} "
+                f"{stats['elapsed']:>8.2f} {stats['requests_per_second']:>8.1f}"
+            )
+        
+        print("\nSeat checks (one per section)")
+        print(f"{'path':>8} {'limit':>6} {'checks':>7} {'ok':>6} {'seconds':>8} {'checks/s':>9} {'p50 ms':>7} {'p95 ms':>7}")
+        for limit in args.limits:
+            results = await bench_seat_checks(base, sections, limit)
+            for path, stats in results.items():
+                rate = stats["checks"] / stats["elapsed"] if stats["elapsed"] else 0.0
+                print(
+                    f"{path:>8} {limit:>6} {stats['checks']:>7} {stats['ok']:>6} {stats['elapsed']:>8.2f} "
+                    f"{rate:>9.1f} {stats['p50'] * 1000:>7.0f} {stats['p95'] * 1000:>7.0f}"
+                )
+        
+        print(f"\nStand-in counters: {app.state.stats}")
+    
+    await close_http_client()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    arg_parser = argparse.ArgumentParser(description="Benchmark crawl and seat checks against the upstream stand-in")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--limits", nargs="+", type=int, default=[5, 20],
+                            help="In-flight request limits to compare")
+    arg_parser.add_argument("--departments", nargs="+", help="Departments to use (default: all in the data)")
+    arg_parser.add_argument("--latency-ms", type=float, default=50.0)
+    arg_parser.add_argument("--jitter-ms", type=float, default=20.0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--churn", type=float, default=0.1)
+    arg_parser.add_argument("--page-kb", type=int, default=30, help="Boilerplate size added to CourSys pages")
+    arg_parser.add_argument("--standin-rate-limit", type=float, default=0.0,
+                            help="Requests per second the stand-in accepts before 429s; 0 disables")
+    arg_parser.add_argument("--client-rate-limit", type=float, default=0.0,
+                            help="Client-side token bucket rate; 0 disables")
+    
+    asyncio.run(main(arg_parser.parse_args()))
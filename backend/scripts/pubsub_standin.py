@@ -0,0 +1,184 @@
+"""
+Pub/Sub Stand-in.
+A minimal Redis-protocol server supporting PUBLISH, SUBSCRIBE, UNSUBSCRIBE,
+PING and AUTH, for running several API processes with
+EVENT_BUS_URL=redis://127.0.0.1:6380 without a real Redis.
+
+Usage:
+    python scripts/pubsub_standin.py --port 6380
+    python scripts/pubsub_standin.py --fanout 4 --clients 2000 --changes 200
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def _bulk(value: str) -> bytes:
+    data = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _array(*values: bytes) -> bytes:
+    return b"*%d\r\n" % len(values) + b"".join(values)
+
+
+async def _read_command(reader: asyncio.StreamReader) -> list[str]:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("closed")
+    if not line.startswith(b"*"):
+        # Inline command, e.g. from telnet
+        return line.decode().split()
+    
+    args = []
+    for _ in range(int(line[1:-2])):
+        length = int((await reader.readline())[1:-2])
+        args.append((await reader.readexactly(length + 2))[:-2].decode())
+    return args
+
+
+class PubSubStandin:
+    """Channel -> subscribed connections."""
+    
+    def __init__(self):
+        self.channels: dict[str, set[asyncio.StreamWriter]] = {}
+        self.published = 0
+    
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: set[str] = set()
+        try:
+            while True:
+                args = await _read_command(reader)
+                if not args:
+                    continue
+                command = args[0].upper()
+                
+                if command == "PUBLISH" and len(args) == 3:
+                    channel, message = args[1], args[2]
+                    receivers = self.channels.get(channel, set())
+                    frame = _array(_bulk("message"), _bulk(channel), _bulk(message))
+                    for receiver in receivers:
+                        receiver.write(frame)
+                    self.published += 1
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif command == "SUBSCRIBE":
+                    for channel in args[1:]:
+                        self.channels.setdefault(channel, set()).add(writer)
+                        subscribed.add(channel)
+                        writer.write(_array(_bulk("subscribe"), _bulk(channel), b":%d\r\n" % len(subscribed)))
+                elif command == "UNSUBSCRIBE":
+                    for channel in args[1:] or list(subscribed):
+                        self.channels.get(channel, set()).discard(writer)
+                        subscribed.discard(channel)
+                        writer.write(_array(_bulk("unsubscribe"), _bulk(channel), b":%d\r\n" % len(subscribed)))
+                elif command == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif command == "AUTH":
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(f"-ERR unknown command '{args[0]}'\r\n".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+
+@contextlib.asynccontextmanager
+async def run_pubsub_standin(port: int):
+    """Serve the stand-in in this event loop for the duration of the block."""
+    standin = PubSubStandin()
+    server = await asyncio.start_server(standin.handle, "127.0.0.1", port)
+    try:
+        yield standin
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def fanout(port: int, processes: int, clients: int, changes: int) -> None:
+    """
+    Simulate several API processes on one bus: clients spread across
+    per-process hubs, one publisher, and count what each process delivers.
+    """
+    from services.event_bus import RedisBus
+    from services.seat_events import SeatChange, SeatEventHub, Subscriber
+    
+    async with run_pubsub_standin(port):
+        hubs = [SeatEventHub() for _ in range(processes)]
+        buses = []
+        for hub in hubs:
+            # Each simulated process delivers into its own hub
+            bus = RedisBus(f"redis://127.0.0.1:{port}", "seat_changes", hub=hub)
+            await bus.start()
+            buses.append(bus)
+        await asyncio.sleep(0.2)
+        
+        rng = random.Random(0)
+        sections = list(range(1, 2001))
+        for i in range(clients):
+            hubs[i % processes].subscribe(Subscriber(), rng.sample(sections, 5))
+        
+        publisher = RedisBus(f"redis://127.0.0.1:{port}", "seat_changes")
+        batch = [SeatChange(section_id, 100, rng.randint(90, 100), 0, 0) for section_id in rng.sample(sections, changes)]
+        expected = sum(len(hub._by_section.get(change.section_id, ())) for hub in hubs for change in batch)
+        
+        start = time.perf_counter()
+        await publisher.publish(batch)
+        while sum(hub.stats["delivered"] for hub in hubs) < expected:
+            await asyncio.sleep(0.005)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        for bus in buses + [publisher]:
+            await bus.stop()
+        # Let the server see the connections close
+        await asyncio.sleep(0.1)
+    
+    print(f"{changes} changes, {clients} clients over {processes} processes")
+    print(f"Delivered {expected} events in {elapsed_ms:.1f}ms (one bus message)")
+    print("Per process:", [hub.stats for hub in hubs])
+
+
+async def serve(port: int) -> None:
+    async with run_pubsub_standin(port) as standin:
+        logger.info(f"Pub/sub stand-in listening on 127.0.0.1:{port}")
+        while True:
+            await asyncio.sleep(60)
+            logger.info(f"{standin.published} messages published")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Redis-protocol pub/sub stand-in")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--fanout", type=int, default=0, help="Simulate this many API processes and exit")
+    parser.add_argument("--clients", type=int, default=1000, help="Connected clients in the simulation")
+    parser.add_argument("--changes", type=int, default=100, help="Seat changes published in the simulation")
+    args = parser.parse_args()
+    
+    if args.fanout:
+        asyncio.run(fanout(args.port, args.fanout, args.clients, args.changes))
+    else:
+        try:
+            asyncio.run(serve(args.port))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlmodel import Session
+from config import settings
 from database import engine, create_db_and_tables
 from models import Course, Section
+from services.crawl_cache import CrawlCache
+from services.crawl_journal import CrawlJournal
+from services.course_writer import CourseWriter
 from services.crawler import SFUCrawler
+from services.http_client import close_http_client
 from services.parser import PrerequisiteParser
 
 logging.basicConfig(
@@ -25,7 +30,9 @@ logger = logging.getLogger(__name__)
 
 async def seed_database(
     departments: list[str] | None = None,
-    term: str = "2026/spring"
+    term: str = "2026/spring",
+    incremental: bool = False,
+    resume: bool = False
 ) -> None:
     """
     Seed the database with course data from SFU.
@@ -33,6 +40,10 @@ async def seed_database(
     Args:
         departments: List of department codes to crawl. If None, crawls all.
         term: Term to crawl (e.g., "2026/spring")
+        incremental: Only write courses whose outline is new or changed
+            since the last incremental crawl.
+        resume: Continue an interrupted crawl of the same term, replaying
+            journaled departments and courses instead of re-fetching them.
     """
     logger.info("Starting database seed...")
     
@@ -40,93 +51,101 @@ async def seed_database(
     create_db_and_tables()
     logger.info("Database tables ready")
     
-    # Initialize crawler and parser
-    crawler = SFUCrawler()
-    parser = PrerequisiteParser()
+    # Load HTTP validators and content hashes from the last crawl
+    cache = None
+    if incremental:
+        cache = CrawlCache()
+        cache.load(f"{settings.SFU_API_BASE_URL}?{term}/")
+    
+    # Journal completed units so an interrupted crawl can resume
+    journal = CrawlJournal(f"outlines:{term}")
+    if resume:
+        journal.load()
+    else:
+        journal.reset()
+    
+    # Crawler tasks feed a bounded queue; the writer batch-upserts from it
+    crawler = SFUCrawler(cache=cache, journal=journal)
+    writer = CourseWriter()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CRAWLER_QUEUE_SIZE)
     
     # Crawl course data
     logger.info(f"Crawling courses for term: {term}")
     if departments:
         logger.info(f"Departments: {', '.join(departments)}")
     
-    all_courses = await crawler.crawl_all_courses(departments, term)
+    writer_task = asyncio.create_task(writer.consume(queue))
+    
+    try:
+        await crawler.stream_all_courses(queue, departments, term)
+    finally:
+        # Let the writer drain what was crawled, even if the crawl failed
+        await queue.put(None)
+        stats = await writer_task
     
-    if not all_courses:
-        logger.warning("No courses were fetched. Check the crawler implementation.")
+    # Only remember content hashes once the data is safely written
+    if cache is not None and not stats.errors:
+        cache.flush()
+    
+    progress = crawler.progress
+    if not progress.emitted:
+        if incremental and progress.unchanged:
+            logger.info(f"All {progress.unchanged} courses unchanged, nothing to write")
+        else:
+            logger.warning("No courses were fetched. Check the crawler implementation.")
         return
     
-    logger.info(f"Fetched {len(all_courses)} courses. Saving to database...")
+    logger.info("=" * 60)
+    logger.info(f"✅ Database seeding complete!")
+    logger.info(f"   Courses added: {stats.courses_added}, updated: {stats.courses_updated}")
+    logger.info(f"   Sections added: {stats.sections_added}, updated: {stats.sections_updated}")
+    logger.info(f"   Batches: {stats.batches} ({stats.write_seconds:.1f}s writing, {stats.errors} failed)")
+    if incremental:
+        logger.info(
+            f"   Outlines new: {progress.new}, changed: {progress.changed}, "
+            f"unchanged: {progress.unchanged}"
+        )
+    logger.info("=" * 60)
+
+
+async def seed_terms(
+    terms: list[str],
+    departments: list[str] | None = None,
+    incremental: bool = False,
+    resume: bool = False,
+    year: str | None = None
+) -> None:
+    """
+    Seed the database with several terms, discovering their departments up front.
     
-    # Save to database
-    with Session(engine) as session:
-        courses_added = 0
-        sections_added = 0
-        
-        for course_data in all_courses:
-            try:
-                # Check if course already exists
-                existing_course = session.get(Course, course_data["id"])
-                
-                if existing_course:
-                    course = existing_course
-                    logger.debug(f"Course {course.id} already exists, updating...")
-                else:
-                    # Parse prerequisites
-                    prereq_tree = None
-                    if course_data.get("prerequisites_raw"):
-                        prereq_tree = parser.parse(course_data["prerequisites_raw"])
-                    
-                    # Create course
-                    course = Course(
-                        id=course_data["id"],
-                        dept=course_data["dept"],
-                        number=course_data["number"],
-                        title=course_data["title"],
-                        description=course_data.get("description"),
-                        credits=course_data.get("credits", 3),
-                        prerequisites_raw=course_data.get("prerequisites_raw"),
-                        prerequisites_logic=prereq_tree
-                    )
-                    
-                    session.add(course)
-                    courses_added += 1
-                
-                # Add sections
-                for section_data in course_data.get("sections", []):
-                    section = Section(
-                        course_id=course.id,
-                        term=section_data["term"],
-                        section_code=section_data["section_code"],
-                        instructor=section_data.get("instructor"),
-                        schedule_json=section_data.get("schedule_json"),
-                        location=section_data.get("location"),
-                        delivery_method=section_data.get("delivery_method", "In Person"),
-                        seats_total=section_data.get("seats_total", 0),
-                        seats_enrolled=section_data.get("seats_enrolled", 0),
-                        waitlist_total=section_data.get("waitlist_total", 0),
-                        waitlist_enrolled=section_data.get("waitlist_enrolled", 0)
-                    )
-                    
-                    session.add(section)
-                    sections_added += 1
-                
-                # Commit in batches
-                if courses_added % 10 == 0:
-                    session.commit()
-                    logger.info(f"Progress: {courses_added} courses, {sections_added} sections")
-                
-            except Exception as e:
-                logger.error(f"Error processing course {course_data.get('id', 'unknown')}: {e}")
-                continue
+    Args:
+        terms: Terms to crawl (e.g., ["2026/spring", "2026/summer"])
+        departments: Department codes to crawl in every term. If None, each
+            term's departments are discovered, all terms in parallel.
+        incremental: See seed_database.
+        resume: See seed_database.
+        year: Crawl every term offered in this year instead of terms.
+    """
+    crawler = SFUCrawler()
+    try:
+        if year:
+            terms = await crawler.fetch_terms(year)
+            if not terms:
+                logger.error(f"No terms found for {year}")
+                return
+            logger.info(f"Terms for {year}: {', '.join(terms)}")
         
-        # Final commit
-        session.commit()
+        # Listings are cached for DEPARTMENT_INDEX_TTL_SECONDS, so the
+        # per-term crawls below reuse them
+        if departments:
+            plan = {term: departments for term in terms}
+        else:
+            plan = await crawler.discover(terms)
         
-        logger.info("=" * 60)
-        logger.info(f"✅ Database seeding complete!")
-        logger.info(f"   Courses added: {courses_added}")
-        logger.info(f"   Sections added: {sections_added}")
-        logger.info("=" * 60)
+        for term in terms:
+            await seed_database(plan[term], term, incremental, resume)
+    finally:
+        await close_http_client()
 
 
 async def seed_sample_data() -> None:
@@ -365,8 +384,23 @@ if __name__ == "__main__":
     )
     arg_parser.add_argument(
         "--term",
-        default="2026/spring",
-        help="Term to crawl (e.g., '2026/spring'). Only used in 'crawl' mode."
+        nargs="+",
+        default=["2026/spring"],
+        help="Terms to crawl (e.g., 2026/spring 2026/summer). Only used in 'crawl' mode."
+    )
+    arg_parser.add_argument(
+        "--year",
+        help="Crawl every term offered in this year (e.g., 2026) instead of --term. Only used in 'crawl' mode."
+    )
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Use conditional requests and skip unchanged course outlines. Only used in 'crawl' mode."
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted crawl of the same term from its journal. Only used in 'crawl' mode."
     )
     
     args = arg_parser.parse_args()
@@ -374,4 +408,4 @@ if __name__ == "__main__":
     if args.mode == "sample":
         asyncio.run(seed_sample_data())
     else:
-        asyncio.run(seed_database(args.departments, args.term))
+        asyncio.run(seed_terms(args.term, args.departments, args.incremental, args.resume, args.year))
@@ -0,0 +1,164 @@
+"""
+SMTP Stand-in.
+A minimal local SMTP server that accepts and records mail, for exercising
+the notification dispatcher without a real mail server. It speaks just
+enough SMTP for smtplib (no STARTTLS or AUTH), so run the backend with
+SMTP_USE_TLS=false and no SMTP_USERNAME against it.
+
+Usage:
+    python scripts/smtp_standin.py --port 8025
+    python scripts/smtp_standin.py --burst 10000 --users 500 --fail-rate 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from email import message_from_bytes
+from email.message import Message
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Mailbox:
+    """Messages accepted by the stand-in."""
+    
+    messages: list[Message] = field(default_factory=list)
+    fail_rate: float = 0.0
+    rejected: int = 0
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, mailbox: Mailbox) -> None:
+    async def reply(line: str) -> None:
+        writer.write(f"{line}\r\n".encode())
+        await writer.drain()
+    
+    await reply("220 localhost SMTP stand-in")
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            
+            if verb in ("EHLO", "HELO"):
+                await reply("250 localhost")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                await reply("250 OK")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = await reader.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    # Undo dot-stuffing
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                
+                if random.random() < mailbox.fail_rate:
+                    mailbox.rejected += 1
+                    await reply("451 Temporary failure")
+                else:
+                    mailbox.messages.append(message_from_bytes(b"".join(lines)))
+                    await reply("250 Queued")
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+    finally:
+        writer.close()
+
+
+@contextlib.asynccontextmanager
+async def run_smtp_standin(port: int, fail_rate: float = 0.0):
+    """Serve the stand-in in this event loop for the duration of the block."""
+    mailbox = Mailbox(fail_rate=fail_rate)
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle(reader, writer, mailbox), "127.0.0.1", port
+    )
+    try:
+        yield mailbox
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def burst(port: int, alerts: int, users: int, fail_rate: float) -> None:
+    """Push a term-start burst of alerts through the dispatcher and count the emails."""
+    from services.notifications import NotificationDispatcher, SMTPTransport, SeatAlert
+    
+    async with run_smtp_standin(port, fail_rate) as mailbox:
+        dispatcher = NotificationDispatcher(
+            SMTPTransport("127.0.0.1", port, "alerts@localhost", use_tls=False),
+            coalesce_seconds=1.0
+        )
+        dispatcher.start()
+        
+        start = time.perf_counter()
+        for i in range(alerts):
+            dispatcher.enqueue(SeatAlert(
+                user_email=f"user{i % users}@example.com",
+                section_id=i,
+                dept="CMPT",
+                number=str(100 + i % 400),
+                title="Stand-in Course",
+                section_code="D100",
+                term="Spring 2026",
+                instructor=None,
+                seats_available=1,
+                seats_total=100
+            ))
+        enqueue_ms = (time.perf_counter() - start) * 1000
+        
+        await dispatcher.stop(timeout=120)
+        elapsed = time.perf_counter() - start
+    
+    print(f"Enqueued {alerts} alerts for {users} users in {enqueue_ms:.1f}ms")
+    print(f"Delivered {len(mailbox.messages)} emails ({mailbox.rejected} rejected attempts) in {elapsed:.1f}s")
+    print(f"Dispatcher stats: {dispatcher.stats}")
+
+
+async def serve(port: int, fail_rate: float) -> None:
+    async with run_smtp_standin(port, fail_rate) as mailbox:
+        logger.info(f"SMTP stand-in listening on 127.0.0.1:{port}")
+        seen = 0
+        while True:
+            await asyncio.sleep(1)
+            for message in mailbox.messages[seen:]:
+                logger.info(f"Mail to {message['To']}: {message['Subject']}")
+            seen = len(mailbox.messages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of messages answered with 451")
+    parser.add_argument("--burst", type=int, default=0, help="Send this many alerts through the dispatcher and exit")
+    parser.add_argument("--users", type=int, default=100, help="Distinct users in the burst")
+    args = parser.parse_args()
+    
+    if args.burst:
+        asyncio.run(burst(args.port, args.burst, args.users, args.fail_rate))
+    else:
+        try:
+            asyncio.run(serve(args.port, args.fail_rate))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
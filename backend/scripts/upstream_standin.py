@@ -0,0 +1,419 @@
+"""
+Upstream Stand-in Server.
+Serves SFU course outlines API JSON and CourSys pages locally so crawler
+and worker throughput can be measured without touching sfu.ca.
+
+Responses are synthesized from data/*.json, or replayed from responses
+recorded against the real upstream. Latency, error rate and rate
+limiting are configurable.
+
+Usage:
+    python scripts/upstream_standin.py --port 8765 --latency-ms 80 --error-rate 0.02
+    python scripts/upstream_standin.py --record recordings/   # proxy to sfu.ca and save
+    python scripts/upstream_standin.py --replay recordings/   # serve saved responses
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
+
+from crawler.sfu_api_client import AsyncSFUAPIClient
+from services.enrollment_source import build_coursys_id
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Real upstreams, used in record mode
+OUTLINES_UPSTREAM = AsyncSFUAPIClient.BASE_URL
+COURSYS_UPSTREAM = AsyncSFUAPIClient.COURSYS_URL
+
+
+@dataclass
+class StandinConfig:
+    """Behaviour knobs for the stand-in."""
+    
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0  # Requests per second; 0 disables
+    rate_burst: int = 10
+    churn: float = 0.0  # Probability an enrolment read changes the seat count
+    page_padding_kb: int = 30  # Boilerplate added to CourSys pages
+    data_files: list[Path] = field(
+        default_factory=lambda: [DATA_DIR / "fall_2025_courses_with_enrollment.json"]
+    )
+    record_dir: Optional[Path] = None
+    replay_dir: Optional[Path] = None
+    seed: int = 1
+
+
+@dataclass
+class Offering:
+    """Mutable enrolment state for one CourSys offering."""
+    
+    title: str
+    enrolled: int
+    capacity: int
+    waitlist: int
+    waitlist_capacity: int
+    description: str = ""
+    prerequisites: str = ""
+
+
+class SyntheticUpstream:
+    """Index of section records from data/*.json, served in upstream formats."""
+    
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.terms: dict[str, set[str]] = {}
+        self.departments: dict[tuple[str, str], set[str]] = {}
+        self.courses: dict[tuple[str, ...], dict[str, str]] = {}
+        self.sections: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        self.details: dict[tuple[str, ...], dict[str, Any]] = {}
+        self.offerings: dict[str, Offering] = {}
+        self.padding = self._make_padding(config.page_padding_kb)
+        
+        for path in config.data_files:
+            with open(path, "r", encoding="utf-8") as f:
+                for record in json.load(f):
+                    self._add(record)
+        
+        logger.info(
+            f"Stand-in loaded {len(self.details)} sections, "
+            f"{len(self.offerings)} CourSys offerings"
+        )
+    
+    def _add(self, record: dict[str, Any]) -> None:
+        """Index one section record."""
+        info = record.get("info", {})
+        outline_path = info.get("outlinePath", "")
+        parts = outline_path.lower().split("/")
+        if len(parts) != 5:
+            return
+        
+        year, season, dept, number, section = parts
+        self.terms.setdefault(year, set()).add(season)
+        self.departments.setdefault((year, season), set()).add(dept)
+        self.courses.setdefault((year, season, dept), {})[number] = info.get("title", "")
+        self.sections.setdefault((year, season, dept, number), []).append({
+            "text": section.upper(),
+            "value": section,
+            "classType": info.get("type", "e"),
+            "sectionCode": (record.get("courseSchedule") or [{}])[0].get("sectionCode", "LEC")
+        })
+        
+        details = {k: v for k, v in record.items() if k != "enrollmentData"}
+        self.details[(year, season, dept, number, section)] = details
+        
+        coursys_id = build_coursys_id(year, season, dept, number, section)
+        if coursys_id not in self.offerings:
+            enrolled, capacity = self._parse_enrolled(record.get("enrollmentData"))
+            waitlist = int((record.get("enrollmentData") or {}).get("waitlist") or 0)
+            self.offerings[coursys_id] = Offering(
+                title=info.get("title", ""),
+                enrolled=enrolled,
+                capacity=capacity,
+                waitlist=waitlist,
+                waitlist_capacity=max(10, waitlist),
+                description=info.get("description", ""),
+                prerequisites=info.get("prerequisites", "")
+            )
+    
+    def _parse_enrolled(self, enrollment: Optional[dict[str, Any]]) -> tuple[int, int]:
+        """Parse "93/100" into (93, 100), inventing numbers when missing."""
+        try:
+            enrolled, capacity = (enrollment or {}).get("enrolled", "").split("/")
+            return int(enrolled), int(capacity)
+        except (AttributeError, ValueError):
+            capacity = self.random.choice([30, 50, 100, 200, 300])
+            return self.random.randint(0, capacity), capacity
+    
+    def _make_padding(self, kb: int) -> str:
+        """Navigation-like boilerplate so pages have a realistic size."""
+        row = '<li class="menu-item"><a href="/browse/">Course browser</a></li>\n'
+        return row * (kb * 1024 // len(row))
+    
+    def _churn(self, offering: Offering) -> None:
+        """Randomly move the seat count to simulate add/drop."""
+        if self.random.random() >= self.config.churn:
+            return
+        
+        delta = self.random.randint(-3, 3)
+        offering.enrolled = max(0, min(offering.capacity, offering.enrolled + delta))
+        if offering.enrolled == offering.capacity:
+            offering.waitlist = max(0, min(offering.waitlist_capacity, offering.waitlist - delta))
+    
+    def outlines(self, query: str) -> Optional[Any]:
+        """Answer an outlines API query like "2025/fall/cmpt/105w/d100"."""
+        parts = [p for p in query.lower().strip("/").split("/") if p]
+        
+        if len(parts) == 1 and parts[0] in self.terms:
+            return [
+                {"text": season.upper(), "value": season}
+                for season in sorted(self.terms[parts[0]])
+            ]
+        if len(parts) == 2 and tuple(parts) in self.departments:
+            return [
+                {"text": dept.upper(), "value": dept, "name": dept.upper()}
+                for dept in sorted(self.departments[tuple(parts)])
+            ]
+        if len(parts) == 3 and tuple(parts) in self.courses:
+            return [
+                {"text": number.upper(), "value": number, "title": title}
+                for number, title in sorted(self.courses[tuple(parts)].items())
+            ]
+        if len(parts) == 4 and tuple(parts) in self.sections:
+            return self.sections[tuple(parts)]
+        if len(parts) == 5 and tuple(parts) in self.details:
+            return self.details[tuple(parts)]
+        return None
+    
+    def coursys_json(self, coursys_id: str) -> Optional[dict[str, Any]]:
+        """CourSys browse/info ?data=yes payload."""
+        offering = self.offerings.get(coursys_id)
+        if not offering:
+            return None
+        
+        self._churn(offering)
+        descrlong = offering.description
+        if offering.prerequisites:
+            descrlong += f" Prerequisite: {offering.prerequisites}."
+        
+        return {
+            "title": offering.title,
+            "descrlong": descrlong,
+            "enrl_cap": offering.capacity,
+            "enrl_tot": offering.enrolled,
+            "wait_tot": offering.waitlist
+        }
+    
+    def coursys_page(self, coursys_id: str) -> Optional[str]:
+        """CourSys browse/info HTML page."""
+        offering = self.offerings.get(coursys_id)
+        if not offering:
+            return None
+        
+        self._churn(offering)
+        waitlist = f" ({offering.waitlist} on waitlist)" if offering.waitlist else ""
+        
+        return (
+            "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+            f"<title>{coursys_id} - CourSys</title></head><body>\n"
+            f"<nav><ul>\n{self.padding}</ul></nav>\n"
+            "<div id=\"page-content\">\n"
+            f"<h1>{offering.title}</h1>\n"
+            "<table class=\"info\"><tbody>\n"
+            f"<tr><th scope=\"row\">Title</th><td>{offering.title}</td></tr>\n"
+            f"<tr><th scope=\"row\">Enrolment</th><td>{offering.enrolled} out of {offering.capacity}{waitlist}</td></tr>\n"
+            f"<tr><th scope=\"row\">Description</th><td>{offering.description}</td></tr>\n"
+            "</tbody></table>\n</div>\n</body></html>\n"
+        )
+    
+    def seat_page(self, year: str, season: str, dept: str, number: str, section: str) -> Optional[str]:
+        """Seat page in the format SFUCrawler.fetch_seat_count reads."""
+        coursys_id = build_coursys_id(year, season, dept, number, section)
+        offering = self.offerings.get(coursys_id)
+        if not offering:
+            return None
+        
+        self._churn(offering)
+        return (
+            "<html><body>\n"
+            f"<nav><ul>\n{self.padding}</ul></nav>\n"
+            "<div class=\"enrollment\">"
+            f"Enrolled: {offering.enrolled}/{offering.capacity} "
+            f"Waitlist: {offering.waitlist}/{offering.waitlist_capacity}"
+            "</div>\n</body></html>\n"
+        )
+
+
+class Recorder:
+    """Saves and replays raw upstream responses, one file per request."""
+    
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+    
+    def load(self, key: str) -> Optional[Response]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        return Response(
+            content=saved["body"],
+            status_code=saved["status"],
+            media_type=saved["content_type"]
+        )
+    
+    def save(self, key: str, response: httpx.Response) -> None:
+        with open(self._path(key), "w", encoding="utf-8") as f:
+            json.dump({
+                "key": key,
+                "status": response.status_code,
+                "content_type": response.headers.get("content-type", "text/plain"),
+                "body": response.text
+            }, f)
+
+
+def create_app(config: Optional[StandinConfig] = None) -> FastAPI:
+    """Build the stand-in application."""
+    config = config or StandinConfig()
+    upstream = SyntheticUpstream(config)
+    limiter = TokenBucket(config.rate_limit, config.rate_burst)
+    recorder = Recorder(config.record_dir or config.replay_dir) if (config.record_dir or config.replay_dir) else None
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "errors_injected": 0, "rate_limited": 0, "not_found": 0}
+    
+    app = FastAPI(title="SFU Upstream Stand-in")
+    app.state.upstream = upstream
+    app.state.stats = stats
+    
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        if request.url.path.startswith("/__"):
+            return await call_next(request)
+        
+        stats["requests"] += 1
+        
+        if not limiter.try_acquire():
+            stats["rate_limited"] += 1
+            return Response(status_code=429, headers={"Retry-After": "1"})
+        
+        latency = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(0.0, latency) / 1000)
+        
+        if rng.random() < config.error_rate:
+            stats["errors_injected"] += 1
+            return Response(status_code=503)
+        
+        response = await call_next(request)
+        if response.status_code == 404:
+            stats["not_found"] += 1
+        return response
+    
+    async def recorded(key: str, upstream_url: str) -> Optional[Response]:
+        """Serve from recordings, or proxy to the real upstream in record mode."""
+        if recorder is None:
+            return None
+        
+        if config.record_dir:
+            async with httpx.AsyncClient(timeout=30) as client:
+                real = await client.get(upstream_url)
+            recorder.save(key, real)
+            return Response(
+                content=real.content,
+                status_code=real.status_code,
+                media_type=real.headers.get("content-type")
+            )
+        
+        return recorder.load(key)
+    
+    @app.get("/bin/wcm/course-outlines")
+    async def course_outlines(request: Request):
+        query = request.url.query
+        
+        saved = await recorded(f"outlines?{query}", f"{OUTLINES_UPSTREAM}?{query}")
+        if saved is not None:
+            return saved
+        
+        data = upstream.outlines(query)
+        if data is None:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return data
+    
+    @app.get("/browse/info/{coursys_id}")
+    async def coursys_info(coursys_id: str, request: Request):
+        query = request.url.query
+        key = f"coursys/{coursys_id}?{query}"
+        upstream_url = f"{COURSYS_UPSTREAM}/{coursys_id}" + (f"?{query}" if query else "")
+        
+        saved = await recorded(key, upstream_url)
+        if saved is not None:
+            return saved
+        
+        if request.query_params.get("data") == "yes":
+            data = upstream.coursys_json(coursys_id)
+            if data is None:
+                return JSONResponse({"error": "not found"}, status_code=404)
+            return data
+        
+        page = upstream.coursys_page(coursys_id)
+        if page is None:
+            return HTMLResponse("<html><body>Not found</body></html>", status_code=404)
+        return HTMLResponse(page)
+    
+    @app.get("/{year}/{season}/{dept}/{number}/{section}")
+    async def seat_page(year: str, season: str, dept: str, number: str, section: str):
+        page = upstream.seat_page(year, season, dept, number, section)
+        if page is None:
+            return HTMLResponse("<html><body>Not found</body></html>", status_code=404)
+        return HTMLResponse(page)
+    
+    @app.get("/__stats")
+    async def get_stats():
+        return stats
+    
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+    
+    arg_parser = argparse.ArgumentParser(description="Run a local stand-in for the SFU outlines API and CourSys")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--latency-ms", type=float, default=50.0)
+    arg_parser.add_argument("--jitter-ms", type=float, default=20.0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    arg_parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429s; 0 disables")
+    arg_parser.add_argument("--rate-burst", type=int, default=10)
+    arg_parser.add_argument("--churn", type=float, default=0.0, help="Probability an enrolment read changes seats")
+    arg_parser.add_argument("--page-kb", type=int, default=30, help="Boilerplate size added to CourSys pages")
+    arg_parser.add_argument("--data", nargs="+", type=Path, help="Section JSON files (default: data/fall_2025_courses_with_enrollment.json)")
+    mode = arg_parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", type=Path, help="Proxy to the real upstream and save responses here")
+    mode.add_argument("--replay", type=Path, help="Serve responses saved by --record")
+    
+    args = arg_parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    
+    standin_config = StandinConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_burst=args.rate_burst,
+        churn=args.churn,
+        page_padding_kb=args.page_kb,
+        record_dir=args.record,
+        replay_dir=args.replay
+    )
+    if args.data:
+        standin_config.data_files = args.data
+    
+    uvicorn.run(create_app(standin_config), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,180 @@
+"""
+Worker Coordination.
+Splits the watched sections into WORKER_SHARDS shards and leases each
+shard to one worker process at a time through the worker_leases table,
+so several processes can share the seat checks without checking the
+same section twice.
+
+Leases are taken and renewed with a conditional UPDATE (or an INSERT
+for a shard nobody has held yet), which the database applies atomically.
+Every worker also keeps a membership lease. Each worker takes at most its
+fair share of the shards based on how many members are live, and gives
+up any excess, so a new worker
+picks up shards within one lease period. With one shard the lease simply
+elects a leader.
+"""
+import logging
+import math
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, or_
+
+from database import engine
+from models import WorkerLease
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SHARD_PREFIX = "seat-shard-"
+
+# Membership rows: one per live worker, so a worker that holds no shards
+# yet still counts towards everyone's fair share
+MEMBER_PREFIX = "seat-worker-"
+
+
+def shard_for(section_id: int, shards: int) -> int:
+    """Shard a section belongs to; matches the SQL filter in the worker."""
+    return section_id % shards
+
+
+class ShardCoordinator:
+    """Holds and renews this process's shard leases."""
+    
+    def __init__(
+        self,
+        shards: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        holder: Optional[str] = None
+    ):
+        """
+        Args:
+            shards: Total shards (defaults to WORKER_SHARDS)
+            lease_seconds: Lease length (defaults to WORKER_LEASE_SECONDS)
+            holder: Id of this worker (defaults to host:pid:random)
+        """
+        self.shards = max(1, shards or settings.WORKER_SHARDS)
+        self.lease_seconds = lease_seconds or settings.WORKER_LEASE_SECONDS
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.owned: set[int] = set()
+    
+    @staticmethod
+    def _name(shard: int) -> str:
+        return f"{SHARD_PREFIX}{shard}"
+    
+    def _claim(self, session: Session, shard: int, now: datetime, exists: bool) -> bool:
+        """Take or renew one lease; True if this worker now holds it."""
+        name = self._name(shard)
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        
+        if exists:
+            result = session.execute(
+                update(WorkerLease)
+                .where(WorkerLease.name == name)
+                .where(or_(WorkerLease.holder == self.holder, WorkerLease.expires_at < now))
+                .values(holder=self.holder, expires_at=expires_at)
+            )
+            return result.rowcount == 1
+        
+        return self._claim_name(session, name, now)
+    
+    def _claim_name(self, session: Session, name: str, now: datetime) -> bool:
+        """Create a lease row held by this worker; False if it already exists."""
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        try:
+            with session.begin_nested():
+                session.add(WorkerLease(name=name, holder=self.holder, expires_at=expires_at, acquired_at=now))
+            return True
+        except IntegrityError:
+            # Another worker created it first
+            return False
+    
+    def _heartbeat(self, session: Session, now: datetime) -> None:
+        """Renew this worker's membership and forget members that died."""
+        name = f"{MEMBER_PREFIX}{self.holder}"
+        result = session.execute(
+            update(WorkerLease)
+            .where(WorkerLease.name == name)
+            .values(expires_at=now + timedelta(seconds=self.lease_seconds))
+        )
+        if result.rowcount == 0:
+            self._claim_name(session, name, now)
+        
+        session.execute(
+            delete(WorkerLease)
+            .where(WorkerLease.name.startswith(MEMBER_PREFIX))
+            .where(WorkerLease.expires_at < now)
+        )
+    
+    def refresh(self) -> set[int]:
+        """
+        Renew held leases and take free shards up to this worker's fair share.
+        
+        Returns:
+            Shards held until the next refresh
+        """
+        now = datetime.utcnow()
+        
+        with Session(engine) as session:
+            self._heartbeat(session, now)
+            
+            leases = {lease.name: lease for lease in session.exec(select(WorkerLease))}
+            members = sum(1 for name in leases if name.startswith(MEMBER_PREFIX))
+            fair_share = math.ceil(self.shards / max(1, members))
+            
+            names = {self._name(shard): shard for shard in range(self.shards)}
+            held = sorted(
+                names[name] for name, lease in leases.items()
+                if name in names and lease.holder == self.holder
+            )
+            
+            keep = held[:fair_share]
+            release = held[fair_share:]
+            
+            owned = {shard for shard in keep if self._claim(session, shard, now, exists=True)}
+            
+            # Start at a random shard so workers starting together don't all race for shard 0
+            candidates = list(range(self.shards))
+            offset = random.randrange(self.shards)
+            for shard in candidates[offset:] + candidates[:offset]:
+                if len(owned) >= fair_share:
+                    break
+                if shard in owned or shard in release:
+                    continue
+                if self._claim(session, shard, now, exists=self._name(shard) in leases):
+                    owned.add(shard)
+            
+            if release:
+                self._release(session, release)
+            session.commit()
+        
+        if owned != self.owned:
+            logger.info(
+                f"Worker {self.holder} holds shards {sorted(owned)} of {self.shards} "
+                f"({members} workers)"
+            )
+        self.owned = owned
+        return owned
+    
+    def _release(self, session: Session, shards: list[int]) -> None:
+        session.execute(
+            update(WorkerLease)
+            .where(WorkerLease.name.in_([self._name(shard) for shard in shards]))
+            .where(WorkerLease.holder == self.holder)
+            .values(holder="", expires_at=datetime.utcnow())
+        )
+    
+    def release_all(self) -> None:
+        """Give up every lease so other workers can take the shards right away."""
+        with Session(engine) as session:
+            if self.owned:
+                self._release(session, sorted(self.owned))
+            session.execute(delete(WorkerLease).where(WorkerLease.name == f"{MEMBER_PREFIX}{self.holder}"))
+            session.commit()
+        self.owned = set()
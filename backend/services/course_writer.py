@@ -0,0 +1,209 @@
+"""
+Course Writer Service.
+Consumes crawled courses from a queue and batch-upserts them into the
+courses and sections tables while the crawl is still running.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from config import settings
+from database import engine as default_engine
+from models import Course, Section
+from services.parser import PrerequisiteParser
+
+logger = logging.getLogger(__name__)
+
+# Marker for a queue read that timed out
+_IDLE = object()
+
+# Seat count columns, written only when a section is first inserted
+SEAT_FIELDS = ('seats_total', 'seats_enrolled', 'waitlist_total', 'waitlist_enrolled')
+
+
+@dataclass
+class WriteStats:
+    """Counters for a writer run."""
+    
+    batches: int = 0
+    courses_added: int = 0
+    courses_updated: int = 0
+    sections_added: int = 0
+    sections_updated: int = 0
+    errors: int = 0
+    write_seconds: float = 0.0
+
+
+class CourseWriter:
+    """
+    Batched upsert writer for crawled course data.
+    
+    Each batch costs two SELECTs (existing course ids and section keys),
+    up to four executemany statements and a single commit.
+    """
+    
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: float = 2.0
+    ):
+        """
+        Args:
+            engine: Database engine. Defaults to the application engine.
+            batch_size: Courses per transaction. Defaults to CRAWLER_WRITE_BATCH_SIZE.
+            flush_interval: Seconds to wait for a full batch before writing
+                a partial one, so data becomes visible during slow crawls.
+        """
+        self.engine = engine or default_engine
+        self.batch_size = batch_size or settings.CRAWLER_WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval
+        self.parser = PrerequisiteParser()
+        self.stats = WriteStats()
+    
+    async def consume(self, queue: asyncio.Queue) -> WriteStats:
+        """
+        Drain a queue of course dictionaries until a None sentinel arrives.
+        
+        Batches are written in a worker thread. While a batch is being
+        written the queue is not drained, so a bounded queue applies
+        backpressure to the producers.
+        
+        Returns:
+            Final write statistics
+        """
+        batch: list[dict[str, Any]] = []
+        
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                item = _IDLE
+            
+            if item is None:
+                break
+            if item is not _IDLE:
+                batch.append(item)
+            
+            # Write a full batch, or a partial one once producers go quiet
+            if len(batch) >= self.batch_size or (batch and item is _IDLE):
+                await asyncio.to_thread(self._write_batch_safe, batch)
+                batch = []
+        
+        if batch:
+            await asyncio.to_thread(self._write_batch_safe, batch)
+        
+        return self.stats
+    
+    def _write_batch_safe(self, batch: list[dict[str, Any]]) -> None:
+        """Write a batch, logging rather than raising on failure."""
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Error writing batch of {len(batch)} courses: {e}", exc_info=True)
+    
+    def write_batch(self, batch: list[dict[str, Any]]) -> None:
+        """Upsert a batch of courses and their sections in one transaction."""
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        
+        # Last occurrence wins if a course appears twice in a batch
+        courses_by_id = {course_data["id"]: course_data for course_data in batch}
+        course_ids = list(courses_by_id)
+        
+        with Session(self.engine) as session:
+            existing_courses = set(session.exec(
+                select(Course.id).where(Course.id.in_(course_ids))
+            ).all())
+            
+            existing_sections = {
+                (course_id, term, section_code): section_id
+                for section_id, course_id, term, section_code in session.exec(
+                    select(Section.id, Section.course_id, Section.term, Section.section_code)
+                    .where(Section.course_id.in_(course_ids))
+                ).all()
+            }
+            
+            course_inserts, course_updates = [], []
+            section_inserts, section_updates = [], []
+            
+            for course_id, course_data in courses_by_id.items():
+                prereq_tree = None
+                if course_data.get("prerequisites_raw"):
+                    prereq_tree = self.parser.parse(course_data["prerequisites_raw"])
+                
+                course_row = {
+                    "id": course_id,
+                    "dept": course_data["dept"],
+                    "number": course_data["number"],
+                    "title": course_data["title"],
+                    "description": course_data.get("description"),
+                    "credits": course_data.get("credits", 3),
+                    "prerequisites_raw": course_data.get("prerequisites_raw"),
+                    "prerequisites_logic": prereq_tree
+                }
+                
+                if course_id in existing_courses:
+                    course_updates.append(course_row)
+                else:
+                    course_inserts.append(course_row)
+                
+                for section_data in course_data.get("sections", []):
+                    section_row = {
+                        "course_id": course_id,
+                        "term": section_data["term"],
+                        "section_code": section_data["section_code"],
+                        "instructor": section_data.get("instructor"),
+                        "schedule_json": section_data.get("schedule_json"),
+                        "location": section_data.get("location"),
+                        "delivery_method": section_data.get("delivery_method", "In Person"),
+                        "updated_at": now
+                    }
+                    
+                    key = (course_id, section_data["term"], section_data["section_code"])
+                    
+                    if key not in existing_sections:
+                        # Seat counts only seed new sections; outlines often omit
+                        # them (read as 0), and after that the seat worker owns them
+                        section_inserts.append({
+                            "created_at": now,
+                            **section_row,
+                            **{name: section_data.get(name, 0) for name in SEAT_FIELDS}
+                        })
+                        # Mark as seen so a repeated section in a payload isn't inserted twice
+                        existing_sections[key] = None
+                    elif existing_sections[key] is not None:
+                        section_updates.append({"id": existing_sections[key], **section_row})
+            
+            if course_inserts:
+                session.execute(insert(Course), course_inserts)
+            if course_updates:
+                session.execute(update(Course), course_updates)
+            if section_inserts:
+                session.execute(insert(Section), section_inserts)
+            if section_updates:
+                session.execute(update(Section), section_updates)
+            
+            session.commit()
+        
+        elapsed = time.perf_counter() - start
+        stats = self.stats
+        stats.batches += 1
+        stats.courses_added += len(course_inserts)
+        stats.courses_updated += len(course_updates)
+        stats.sections_added += len(section_inserts)
+        stats.sections_updated += len(section_updates)
+        stats.write_seconds += elapsed
+        
+        logger.info(
+            f"Wrote batch {stats.batches}: {len(courses_by_id)} courses, "
+            f"{len(section_inserts) + len(section_updates)} sections in {elapsed * 1000:.0f}ms"
+        )
@@ -0,0 +1,121 @@
+"""
+Crawl Cache Service.
+Tracks ETag, Last-Modified and a content hash per upstream URL so
+incremental crawls can send conditional requests and skip unchanged payloads.
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from database import engine as default_engine
+from models import CrawlCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Change classifications
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def content_hash(content: bytes) -> str:
+    """Hash a response body."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class CrawlCache:
+    """
+    In-memory view of the crawl_cache table for one crawl.
+    
+    Entries are loaded once up front and new validators are buffered;
+    call flush() only after the crawled data has been persisted, so a
+    failed write is re-fetched on the next run.
+    """
+    
+    def __init__(self, engine: Optional[Engine] = None):
+        self.engine = engine or default_engine
+        self._entries: dict[str, CrawlCacheEntry] = {}
+        self._pending: dict[str, CrawlCacheEntry] = {}
+    
+    def load(self, url_prefix: Optional[str] = None) -> int:
+        """
+        Load cached entries, optionally only those under a URL prefix.
+        
+        Returns:
+            Number of entries loaded
+        """
+        with Session(self.engine) as session:
+            statement = select(CrawlCacheEntry)
+            if url_prefix:
+                statement = statement.where(CrawlCacheEntry.url.startswith(url_prefix))
+            
+            for entry in session.exec(statement).all():
+                session.expunge(entry)
+                self._entries[entry.url] = entry
+        
+        logger.info(f"Loaded {len(self._entries)} crawl cache entries")
+        return len(self._entries)
+    
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a URL."""
+        entry = self._entries.get(url)
+        if not entry:
+            return {}
+        
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+    
+    def classify(self, url: str, digest: str) -> str:
+        """Classify a fetched payload as new, changed or unchanged."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return NEW
+        if entry.content_hash == digest:
+            return UNCHANGED
+        return CHANGED
+    
+    def record(
+        self,
+        url: str,
+        digest: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """Buffer updated validators for a URL."""
+        self._pending[url] = CrawlCacheEntry(
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=digest,
+            checked_at=datetime.utcnow()
+        )
+    
+    def flush(self) -> int:
+        """
+        Write buffered entries to the database.
+        
+        Returns:
+            Number of entries written
+        """
+        if not self._pending:
+            return 0
+        
+        with Session(self.engine) as session:
+            for entry in self._pending.values():
+                session.merge(entry)
+            session.commit()
+        
+        written = len(self._pending)
+        self._entries.update(self._pending)
+        self._pending = {}
+        
+        logger.info(f"Saved {written} crawl cache entries")
+        return written
@@ -0,0 +1,128 @@
+"""
+Crawl Journal Service.
+Durably records completed department, course and section units so an
+interrupted crawl can resume without re-fetching finished work.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, delete, select
+
+from database import engine as default_engine
+from models import CrawlJournalEntry
+
+logger = logging.getLogger(__name__)
+
+
+def dept_unit(*parts: str) -> str:
+    """Journal key for a department, e.g. dept_unit("CMPT") -> "dept:CMPT"."""
+    return "dept:" + "/".join(parts)
+
+
+def course_unit(*parts: str) -> str:
+    """Journal key for a course, e.g. course_unit("CMPT", "276") -> "course:CMPT/276"."""
+    return "course:" + "/".join(parts)
+
+
+def section_unit(*parts: str) -> str:
+    """Journal key for a section, e.g. section_unit("CMPT", "276", "d100")."""
+    return "section:" + "/".join(parts)
+
+
+class CrawlJournal:
+    """
+    Journal of completed units for one crawl.
+    
+    Units are buffered and written every `flush_every` completions, so a
+    crash loses at most that many units of work. Re-marking a unit
+    overwrites it, which keeps re-runs idempotent.
+    """
+    
+    def __init__(
+        self,
+        crawl_id: str,
+        engine: Optional[Engine] = None,
+        flush_every: int = 20
+    ):
+        self.crawl_id = crawl_id
+        self.engine = engine or default_engine
+        self.flush_every = flush_every
+        self._done: set[str] = set()
+        self._payloads: dict[str, Optional[dict[str, Any]]] = {}
+        self._pending: dict[str, Optional[dict[str, Any]]] = {}
+    
+    def load(self) -> int:
+        """
+        Load completed units from a previous run.
+        
+        Returns:
+            Number of completed units
+        """
+        with Session(self.engine) as session:
+            statement = select(CrawlJournalEntry).where(
+                CrawlJournalEntry.crawl_id == self.crawl_id
+            )
+            for entry in session.exec(statement).all():
+                self._done.add(entry.unit)
+                self._payloads[entry.unit] = entry.payload
+        
+        logger.info(f"Resuming crawl '{self.crawl_id}': {len(self._done)} units already complete")
+        return len(self._done)
+    
+    def reset(self) -> None:
+        """Forget all completed units, starting the crawl from scratch."""
+        with Session(self.engine) as session:
+            session.exec(
+                delete(CrawlJournalEntry).where(CrawlJournalEntry.crawl_id == self.crawl_id)
+            )
+            session.commit()
+        
+        self._done = set()
+        self._payloads = {}
+        self._pending = {}
+    
+    def is_done(self, unit: str) -> bool:
+        """Check whether a unit has already been completed."""
+        return unit in self._done
+    
+    def payload(self, unit: str) -> Optional[dict[str, Any]]:
+        """
+        Get the stored result of a unit completed in a previous run.
+        Payloads are released once replayed, so memory stays flat on resume.
+        """
+        return self._payloads.pop(unit, None)
+    
+    def mark_done(self, unit: str, payload: Optional[dict[str, Any]] = None) -> None:
+        """Record a unit as complete, flushing if enough units are buffered."""
+        self._done.add(unit)
+        self._pending[unit] = payload
+        
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Write buffered units to the database.
+        
+        Returns:
+            Number of units written
+        """
+        if not self._pending:
+            return 0
+        
+        now = datetime.utcnow()
+        with Session(self.engine) as session:
+            for unit, payload in self._pending.items():
+                session.merge(CrawlJournalEntry(
+                    crawl_id=self.crawl_id,
+                    unit=unit,
+                    payload=payload,
+                    completed_at=now
+                ))
+            session.commit()
+        
+        written = len(self._pending)
+        self._pending = {}
+        return written
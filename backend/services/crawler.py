@@ -4,32 +4,240 @@ Fetches course data from SFU's public API with async concurrency control.
 """
 import asyncio
 import logging
-from typing import Optional, Any
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Any
 from datetime import datetime
 
 import httpx
-from bs4 import BeautifulSoup
 
 from config import settings
+from services.http_client import get_http_client
+from services.crawl_cache import CrawlCache, content_hash, NEW, CHANGED, UNCHANGED
+from services.crawl_journal import CrawlJournal, course_unit, dept_unit
+from services.enrollment_extractor import extract_seat_counts
+from services.resilience import Stale, resilient_get
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CrawlProgress:
+    """Running counters for a crawl."""
+    
+    departments_total: int = 0
+    departments_done: int = 0
+    courses_total: int = 0
+    courses_done: int = 0
+    sections_done: int = 0
+    requests: int = 0
+    errors: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    resumed: int = 0
+    emitted: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the crawl started."""
+        return time.monotonic() - self.started_at
+
+
+class TermIndex:
+    """In-memory TTL cache for the term and department listings."""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, list[str]]] = {}
+    
+    def get(self, key: str) -> Optional[list[str]]:
+        """Get a cached listing, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, values = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return list(values)
+    
+    def set(self, key: str, values: list[str]) -> None:
+        """Cache a listing."""
+        self._entries[key] = (time.monotonic() + self.ttl, list(values))
+    
+    def clear(self) -> None:
+        """Drop all cached listings."""
+        self._entries.clear()
+
+
+# Common SFU departments, used when discovery fails
+DEFAULT_DEPARTMENTS = (
+    "CMPT", "MATH", "ENSC", "PHYS", "STAT", "CHEM", "BISC",
+    "ECON", "BUS", "PSYC", "PHIL", "HIST", "ENGL", "FREN"
+)
+
+# Shared across crawler instances (seed scripts, worker, routes)
+_term_index = TermIndex(settings.DEPARTMENT_INDEX_TTL_SECONDS)
+
+
 class SFUCrawler:
     """Async crawler for SFU course data."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        concurrency_limit: Optional[int] = None,
+        progress_callback: Optional[Callable[[CrawlProgress], None]] = None,
+        cache: Optional[CrawlCache] = None,
+        journal: Optional[CrawlJournal] = None
+    ):
+        """
+        Args:
+            client: HTTP client to use. If None, the shared pooled client
+                from services.http_client is used.
+            concurrency_limit: Max in-flight HTTP requests. Defaults to
+                CRAWLER_CONCURRENCY_LIMIT.
+            progress_callback: Called with a CrawlProgress after each
+                department and course completes.
+            cache: Enables incremental mode. Course outlines are fetched
+                with conditional requests and unchanged ones are skipped.
+            journal: Records completed departments and courses. Units
+                already in the journal are replayed instead of fetched.
+        """
         self.base_url = settings.SFU_API_BASE_URL
         self.timeout = settings.CRAWLER_TIMEOUT
-        self.semaphore = asyncio.Semaphore(settings.CRAWLER_CONCURRENCY_LIMIT)
-        
-    async def fetch_departments(self) -> list[str]:
-        """Fetch list of all departments."""
-        # Common SFU departments
-        return [
-            "CMPT", "MATH", "ENSC", "PHYS", "STAT", "CHEM", "BISC",
-            "ECON", "BUS", "PSYC", "PHIL", "HIST", "ENGL", "FREN"
-        ]
+        self.semaphore = asyncio.Semaphore(
+            concurrency_limit or settings.CRAWLER_CONCURRENCY_LIMIT
+        )
+        self._client = client
+        self.cache = cache
+        self.journal = journal
+        self.sink: Optional[asyncio.Queue] = None
+        self.progress = CrawlProgress()
+        self.progress_callback = progress_callback
+        self.progress_log_interval = 5.0
+        self._last_progress_log = 0.0
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client reused across all requests."""
+        if self._client is not None:
+            return self._client
+        return get_http_client()
+    
+    async def close(self) -> None:
+        """Close the HTTP client if this crawler was given its own."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+    
+    async def __aenter__(self) -> "SFUCrawler":
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+        
+    async def fetch_terms(self, year: str) -> list[str]:
+        """
+        Fetch the terms offered in a year (e.g., ["2026/spring", "2026/summer"]).
+        Results are cached for DEPARTMENT_INDEX_TTL_SECONDS.
+        """
+        cached = _term_index.get(year)
+        if cached is not None:
+            return cached
+        
+        try:
+            data = await self._get_json(f"{self.base_url}?{year}")
+            terms = [f"{year}/{item['value']}" for item in data if item.get("value")]
+        except Exception as e:
+            logger.error(f"Error fetching terms for {year}: {e}")
+            return []
+        
+        _term_index.set(year, terms)
+        return terms
+    
+    async def fetch_departments(self, term: str = "2026/spring") -> list[str]:
+        """
+        Fetch all departments offering courses in a term.
+        Results are cached for DEPARTMENT_INDEX_TTL_SECONDS; if the
+        upstream is unavailable, a list of common departments is returned.
+        """
+        cached = _term_index.get(term)
+        if cached is not None:
+            return cached
+        
+        try:
+            data = await self._get_json(f"{self.base_url}?{term}")
+            departments = [item["value"].upper() for item in data if item.get("value")]
+        except Exception as e:
+            logger.error(f"Error fetching departments for {term}: {e}")
+            departments = []
+        
+        if not departments:
+            logger.warning(f"Falling back to default departments for {term}")
+            return list(DEFAULT_DEPARTMENTS)
+        
+        _term_index.set(term, departments)
+        logger.info(f"Discovered {len(departments)} departments for {term}")
+        return departments
+    
+    async def discover(self, terms: list[str]) -> dict[str, list[str]]:
+        """
+        Fetch the department list for several terms in parallel.
+        
+        Returns:
+            Mapping of term to department codes
+        """
+        results = await asyncio.gather(*[
+            self.fetch_departments(term) for term in terms
+        ])
+        return dict(zip(terms, results))
+    
+    async def _get_json(self, url: str) -> Any:
+        """
+        GET a URL and decode JSON.
+        The semaphore bounds in-flight HTTP requests, not whole departments,
+        and the shared per-host rate limiter paces them. Transient failures
+        are retried with backoff.
+        """
+        response = await resilient_get(self.client, url, self.semaphore)
+        
+        self.progress.requests += 1
+        response.raise_for_status()
+        return response.json()
+    
+    async def _get_json_incremental(self, url: str) -> tuple[str, Any]:
+        """
+        Conditionally GET a URL using the crawl cache.
+        
+        Returns:
+            Tuple of (change status, decoded JSON). The JSON is None when
+            the payload is unchanged, so it is never parsed.
+        """
+        headers = self.cache.conditional_headers(url)
+        
+        response = await resilient_get(self.client, url, self.semaphore, headers=headers)
+        
+        self.progress.requests += 1
+        
+        if response.status_code == 304:
+            return UNCHANGED, None
+        
+        response.raise_for_status()
+        
+        digest = content_hash(response.content)
+        status = self.cache.classify(url, digest)
+        data = response.json() if status != UNCHANGED else None
+        
+        self.cache.record(
+            url,
+            digest,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+        return status, data
     
     async def fetch_course_outlines(
         self, 
@@ -38,6 +246,7 @@ class SFUCrawler:
     ) -> list[dict[str, Any]]:
         """
         Fetch all course outlines for a department in a given term.
+        Course detail requests are fanned out concurrently.
         
         Args:
             dept: Department code (e.g., "CMPT")
@@ -46,40 +255,53 @@ class SFUCrawler:
         Returns:
             List of course data dictionaries
         """
-        async with self.semaphore:
-            try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    # First, get the list of courses
-                    url = f"{self.base_url}?{term}/{dept}"
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    
-                    courses_data = response.json()
-                    
-                    if not isinstance(courses_data, list):
-                        logger.warning(f"Unexpected response format for {dept}: {type(courses_data)}")
-                        return []
-                    
-                    # Parse each course
-                    courses = []
-                    for course_info in courses_data:
-                        if isinstance(course_info, dict) and "value" in course_info:
-                            course_number = course_info["value"]
-                            course_details = await self._fetch_course_details(
-                                dept, course_number, term
-                            )
-                            if course_details:
-                                courses.append(course_details)
-                    
-                    logger.info(f"Fetched {len(courses)} courses for {dept}")
-                    return courses
-                    
-            except httpx.HTTPError as e:
-                logger.error(f"HTTP error fetching {dept}: {e}")
-                return []
-            except Exception as e:
-                logger.error(f"Error fetching {dept}: {e}")
-                return []
+        journal = self.journal
+        unit = dept_unit(dept)
+        
+        try:
+            if journal and journal.is_done(unit):
+                # Department listing already journaled; courses replay from the journal
+                course_numbers = journal.payload(unit)["courses"]
+            else:
+                # First, get the list of courses
+                courses_data = await self._get_json(f"{self.base_url}?{term}/{dept}")
+                
+                if not isinstance(courses_data, list):
+                    logger.warning(f"Unexpected response format for {dept}: {type(courses_data)}")
+                    return []
+                
+                course_numbers = [
+                    course_info["value"]
+                    for course_info in courses_data
+                    if isinstance(course_info, dict) and "value" in course_info
+                ]
+            self.progress.courses_total += len(course_numbers)
+            
+            # Fetch every course in the department concurrently
+            results = await asyncio.gather(*[
+                self._fetch_course_details(dept, number, term)
+                for number in course_numbers
+            ])
+            courses = [course for course in results if course]
+            
+            # The department is complete once every course in it is
+            if journal and all(journal.is_done(course_unit(dept, n)) for n in course_numbers):
+                journal.mark_done(unit, {"courses": course_numbers})
+            
+            logger.info(f"Fetched {len(course_numbers)} courses for {dept}")
+            return courses
+            
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error fetching {dept}: {e}")
+            self.progress.errors += 1
+            return []
+        except Exception as e:
+            logger.error(f"Error fetching {dept}: {e}")
+            self.progress.errors += 1
+            return []
+        finally:
+            self.progress.departments_done += 1
+            self._report_progress()
     
     async def _fetch_course_details(
         self,
@@ -87,70 +309,117 @@ class SFUCrawler:
         number: str,
         term: str
     ) -> Optional[dict[str, Any]]:
-        """Fetch detailed information for a specific course."""
+        """
+        Fetch detailed information for a specific course.
+        Sections are parsed from the same outline payload, so each course
+        costs a single request.
+        """
+        journal = self.journal
+        unit = course_unit(dept, number)
+        
+        if journal and journal.is_done(unit):
+            self.progress.resumed += 1
+            self.progress.courses_done += 1
+            return await self._emit(journal.payload(unit))
+        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                url = f"{self.base_url}?{term}/{dept}/{number}"
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Parse the course data
-                course_id = f"{dept}-{number}"
-                
-                # Extract basic course info
-                course_data = {
-                    "id": course_id,
-                    "dept": dept,
-                    "number": number,
-                    "title": data.get("title", ""),
-                    "description": data.get("description", ""),
-                    "credits": self._parse_credits(data.get("units", "3")),
-                    "prerequisites_raw": data.get("prerequisites", ""),
-                    "sections": []
-                }
-                
-                # Fetch sections for this course
-                sections = await self._fetch_sections(dept, number, term)
-                course_data["sections"] = sections
-                
-                return course_data
-                
+            url = f"{self.base_url}?{term}/{dept}/{number}"
+            
+            if self.cache is not None:
+                status, data = await self._get_json_incremental(url)
+                self._count_change(status)
+                if status == UNCHANGED:
+                    if journal:
+                        journal.mark_done(unit)
+                    return None
+            else:
+                data = await self._get_json(url)
+            
+            # Parse the course data
+            course_id = f"{dept}-{number}"
+            
+            # Extract basic course info
+            course_data = {
+                "id": course_id,
+                "dept": dept,
+                "number": number,
+                "title": data.get("title", ""),
+                "description": data.get("description", ""),
+                "credits": self._parse_credits(data.get("units", "3")),
+                "prerequisites_raw": data.get("prerequisites", ""),
+                "sections": self._parse_sections(data, term)
+            }
+            
+            self.progress.sections_done += len(course_data["sections"])
+            if journal:
+                journal.mark_done(unit, course_data)
+            return await self._emit(course_data)
+            
         except Exception as e:
             logger.error(f"Error fetching details for {dept} {number}: {e}")
+            self.progress.errors += 1
             return None
+        finally:
+            self.progress.courses_done += 1
+            self._report_progress()
     
-    async def _fetch_sections(
-        self,
-        dept: str,
-        number: str,
-        term: str
-    ) -> list[dict[str, Any]]:
-        """Fetch all sections for a course."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # This would hit a sections endpoint
-                # For now, return mock structure that matches what we expect
-                url = f"{self.base_url}?{term}/{dept}/{number}"
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                data = response.json()
-                sections_list = []
-                
-                # Parse sections from the response
-                if "courseSchedule" in data:
-                    for section_data in data["courseSchedule"]:
-                        section = self._parse_section(section_data, term)
-                        if section:
-                            sections_list.append(section)
-                
-                return sections_list
-                
-        except Exception as e:
-            logger.error(f"Error fetching sections for {dept} {number}: {e}")
-            return []
+    async def _emit(self, course_data: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        """
+        Hand a crawled course to the caller.
+        When streaming, the course is put on the sink queue (waiting while
+        it is full) and None is returned so nothing accumulates in memory.
+        """
+        if course_data is None:
+            return None
+        
+        self.progress.emitted += 1
+        
+        if self.sink is None:
+            return course_data
+        
+        await self.sink.put(course_data)
+        return None
+    
+    def _parse_sections(self, data: dict[str, Any], term: str) -> list[dict[str, Any]]:
+        """Parse all sections from a course outline payload."""
+        sections_list = []
+        
+        if "courseSchedule" in data:
+            for section_data in data["courseSchedule"]:
+                section = self._parse_section(section_data, term)
+                if section:
+                    sections_list.append(section)
+        
+        return sections_list
+    
+    def _count_change(self, status: str) -> None:
+        """Update incremental crawl counters."""
+        if status == NEW:
+            self.progress.new += 1
+        elif status == CHANGED:
+            self.progress.changed += 1
+        else:
+            self.progress.unchanged += 1
+    
+    def _report_progress(self) -> None:
+        """Invoke the progress callback and periodically log progress."""
+        progress = self.progress
+        
+        if self.progress_callback:
+            try:
+                self.progress_callback(progress)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+        
+        now = time.monotonic()
+        if now - self._last_progress_log >= self.progress_log_interval:
+            self._last_progress_log = now
+            logger.info(
+                f"Crawl progress: {progress.departments_done}/{progress.departments_total} departments, "
+                f"{progress.courses_done}/{progress.courses_total} courses, "
+                f"{progress.requests} requests, {progress.errors} errors, "
+                f"{progress.elapsed:.1f}s"
+            )
     
     def _parse_section(self, section_data: dict[str, Any], term: str) -> Optional[dict[str, Any]]:
         """Parse section data into our format."""
@@ -250,25 +519,34 @@ class SFUCrawler:
         """
         Crawl all courses for multiple departments.
         
+        In incremental mode (a cache was given) only new and changed
+        courses are returned; unchanged ones are counted in self.progress.
+        
         Args:
-            departments: List of department codes. If None, fetches all departments.
+            departments: List of department codes. If None, every department
+                offering courses in the term is discovered and crawled.
             term: Term to fetch data for.
             
         Returns:
             List of all course data
         """
         if departments is None:
-            departments = await self.fetch_departments()
+            departments = await self.fetch_departments(term)
         
         logger.info(f"Starting crawl for {len(departments)} departments")
+        self.progress = CrawlProgress(departments_total=len(departments))
         
-        # Fetch all departments concurrently
+        # Fetch all departments concurrently; requests are bounded by the semaphore
         tasks = [
             self.fetch_course_outlines(dept, term)
             for dept in departments
         ]
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if self.journal:
+                self.journal.flush()
         
         # Flatten results
         all_courses = []
@@ -278,10 +556,56 @@ class SFUCrawler:
             elif isinstance(result, Exception):
                 logger.error(f"Task failed with exception: {result}")
         
-        logger.info(f"Crawl complete. Total courses: {len(all_courses)}")
+        progress = self.progress
+        logger.info(
+            f"Crawl complete. Total courses: {progress.emitted} "
+            f"({progress.requests} requests in {progress.elapsed:.1f}s, {progress.errors} errors)"
+        )
+        if progress.resumed:
+            logger.info(f"Resumed {progress.resumed} courses from the crawl journal")
+        if self.cache is not None:
+            logger.info(
+                f"Incremental crawl: {progress.new} new, {progress.changed} changed, "
+                f"{progress.unchanged} unchanged"
+            )
         return all_courses
     
-    async def fetch_seat_count(self, dept: str, number: str, section: str, term: str) -> dict[str, int]:
+    async def stream_all_courses(
+        self,
+        queue: asyncio.Queue,
+        departments: Optional[list[str]] = None,
+        term: str = "2026/spring"
+    ) -> CrawlProgress:
+        """
+        Crawl all courses, putting each one on a queue as soon as it is parsed.
+        
+        The queue should be bounded: when the consumer falls behind, put()
+        blocks and crawler tasks stop issuing new requests until it catches up.
+        The caller is responsible for signalling the consumer when this returns.
+        
+        Args:
+            queue: Destination for course data dictionaries.
+            departments: List of department codes. If None, fetches all departments.
+            term: Term to fetch data for.
+            
+        Returns:
+            Final crawl progress counters
+        """
+        self.sink = queue
+        try:
+            await self.crawl_all_courses(departments, term)
+        finally:
+            self.sink = None
+        
+        return self.progress
+    
+    async def fetch_seat_count(
+        self,
+        dept: str,
+        number: str,
+        section: str,
+        term: str
+    ) -> dict[str, int] | Stale:
         """
         Scrape current seat availability from CourSys.
         This is used by the background worker for real-time updates.
@@ -293,51 +617,22 @@ class SFUCrawler:
                 'waitlist_total': int,
                 'waitlist_enrolled': int
             }
+            or Stale if the page couldn't be fetched or had no enrollment
+            data, in which case the stored counts should be kept.
         """
         try:
             # Build CourSys URL (this is an example structure)
             courys_url = f"{settings.SFU_COURYS_BASE_URL}/{term}/{dept}/{number}/{section}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(courys_url)
-                response.raise_for_status()
-                
-                # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract seat information (adjust selectors based on actual HTML structure)
-                seats_data = {
-                    'seats_total': 0,
-                    'seats_enrolled': 0,
-                    'waitlist_total': 0,
-                    'waitlist_enrolled': 0
-                }
-                
-                # Example parsing (adjust based on actual HTML)
-                enrollment_section = soup.find('div', class_='enrollment')
-                if enrollment_section:
-                    # Parse enrollment numbers from HTML
-                    # This is a placeholder - actual implementation depends on HTML structure
-                    text = enrollment_section.get_text()
-                    import re
-                    
-                    enrolled_match = re.search(r'Enrolled:\s*(\d+)/(\d+)', text)
-                    if enrolled_match:
-                        seats_data['seats_enrolled'] = int(enrolled_match.group(1))
-                        seats_data['seats_total'] = int(enrolled_match.group(2))
-                    
-                    waitlist_match = re.search(r'Waitlist:\s*(\d+)/(\d+)', text)
-                    if waitlist_match:
-                        seats_data['waitlist_enrolled'] = int(waitlist_match.group(1))
-                        seats_data['waitlist_total'] = int(waitlist_match.group(2))
-                
-                return seats_data
-                
+            response = await resilient_get(self.client, courys_url)
+            response.raise_for_status()
+            
+            seats_data = extract_seat_counts(response.text)
+            if seats_data is None:
+                return Stale("no enrollment data on page")
+            
+            return seats_data
+            
         except Exception as e:
             logger.error(f"Error fetching seat count for {dept} {number} {section}: {e}")
-            return {
-                'seats_total': 0,
-                'seats_enrolled': 0,
-                'waitlist_total': 0,
-                'waitlist_enrolled': 0
-            }
+            return Stale(str(e))
@@ -0,0 +1,98 @@
+"""
+Seat Check Cycle Metrics.
+Timing and counts for each seat watcher cycle, kept for the last few
+cycles and logged as one line per cycle.
+
+The numbers that say when to scale out are start_delay_seconds (the
+scheduler started the cycle late because the event loop or the previous
+cycle was busy), max_overdue_seconds (how long past its due time the most
+overdue section waited) and due vs checked (the request budget or shard
+didn't cover everything due).
+"""
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cycles kept in memory for the metrics endpoint
+HISTORY_SIZE = 50
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class CycleMetrics:
+    """Measurements for one seat check cycle."""
+    
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    start_delay_seconds: float = 0.0
+    shards: list[int] = field(default_factory=list)
+    watched: int = 0
+    due: int = 0
+    checked: int = 0
+    stale: int = 0
+    changed: int = 0
+    max_overdue_seconds: float = 0.0
+    upstream_ms: list[float] = field(default_factory=list)
+    write_ms: float = 0.0
+    alerts_queued: int = 0
+    duration_seconds: float = 0.0
+    
+    def summary(self) -> dict[str, Any]:
+        """JSON-friendly view, with upstream latency reduced to percentiles."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "start_delay_seconds": round(self.start_delay_seconds, 3),
+            "shards": self.shards,
+            "watched": self.watched,
+            "due": self.due,
+            "checked": self.checked,
+            "stale": self.stale,
+            "changed": self.changed,
+            "max_overdue_seconds": round(self.max_overdue_seconds, 1),
+            "upstream_p50_ms": round(percentile(self.upstream_ms, 50), 1),
+            "upstream_p95_ms": round(percentile(self.upstream_ms, 95), 1),
+            "upstream_p99_ms": round(percentile(self.upstream_ms, 99), 1),
+            "upstream_max_ms": round(max(self.upstream_ms, default=0.0), 1),
+            "write_ms": round(self.write_ms, 1),
+            "alerts_queued": self.alerts_queued,
+            "duration_seconds": round(self.duration_seconds, 3)
+        }
+
+
+class CycleMetricsLog:
+    """Recent cycles plus counts of runs the scheduler skipped."""
+    
+    def __init__(self, size: int = HISTORY_SIZE):
+        self.cycles: deque[CycleMetrics] = deque(maxlen=size)
+        self.skipped_overlapping = 0
+        self.missed = 0
+        self.scheduled_at: Optional[datetime] = None
+    
+    def record(self, metrics: CycleMetrics) -> None:
+        self.cycles.append(metrics)
+        summary = metrics.summary()
+        logger.info(
+            "Seat check cycle: "
+            + ", ".join(f"{key}={value}" for key, value in summary.items() if key != "started_at")
+        )
+    
+    def summary(self) -> dict[str, Any]:
+        last = self.cycles[-1] if self.cycles else None
+        return {
+            "cycles_recorded": len(self.cycles),
+            "skipped_overlapping": self.skipped_overlapping,
+            "missed": self.missed,
+            "last": last.summary() if last else None,
+            "recent": [cycle.summary() for cycle in self.cycles]
+        }
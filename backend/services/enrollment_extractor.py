@@ -0,0 +1,112 @@
+"""
+Enrollment Extractor.
+Pulls enrolment and waitlist numbers out of CourSys pages without building
+a document tree.
+
+The pages are large but the numbers sit in one small cell, so we locate
+the label in the raw HTML and only strip tags from a short window after
+it. This costs a few string searches per page instead of a full
+BeautifulSoup parse plus get_text() over the whole document.
+"""
+import html as html_lib
+import re
+from typing import Optional
+
+# Characters of markup examined after a label
+WINDOW = 400
+
+_TAG = re.compile(r"<[^>]*>")
+_ENROLMENT = re.compile(r"Enrolment\s*(\d+)\s*out of\s*(\d+)")
+_WAITLIST_PATTERNS = (
+    re.compile(r"\((\d+)\s+on\s+waitlist\)", re.IGNORECASE),  # (39 on waitlist) - most common format
+    re.compile(r"waitlist:\s*(\d+)", re.IGNORECASE),           # Waitlist: 15
+    re.compile(r"(\d+)\s+on\s+waitlist", re.IGNORECASE),       # 15 on waitlist (without parens)
+)
+_WAITLIST_WORD = re.compile(r"waitlist", re.IGNORECASE)
+
+_SEATS_BLOCK = re.compile(r'<div[^>]*\bclass="(?:[^"]*\s)?enrollment(?:\s[^"]*)?"[^>]*>')
+_SEATS_ENROLLED = re.compile(r"Enrolled:\s*(\d+)/(\d+)")
+_SEATS_WAITLIST = re.compile(r"Waitlist:\s*(\d+)/(\d+)")
+
+
+def _text(fragment: str) -> str:
+    """Visible text of an HTML fragment, joined the way get_text() joins it."""
+    return html_lib.unescape(_TAG.sub("", fragment))
+
+
+def _find_waitlist(text: str) -> Optional[str]:
+    for pattern in _WAITLIST_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def extract_enrollment(page: str) -> tuple[Optional[str], Optional[str]]:
+    """
+    Extract enrollment and waitlist from a CourSys browse/info page.
+    
+    Returns:
+        Tuple of (enrolled/capacity, waitlist) e.g., ("161/331", "39");
+        either is None if not on the page
+    """
+    enrolled_capacity = None
+    waitlist = None
+    
+    # The label may also appear in navigation or help text; take the
+    # first occurrence that is followed by the numbers
+    start = page.find("Enrolment")
+    while start != -1:
+        text = _text(page[start:start + WINDOW])
+        match = _ENROLMENT.match(text)
+        if match:
+            enrolled_capacity = f"{match.group(1)}/{match.group(2)}"
+            # Usually in the same cell: "161 out of 331 (39 on waitlist)"
+            waitlist = _find_waitlist(text)
+            break
+        start = page.find("Enrolment", start + 1)
+    
+    if waitlist is None:
+        for match in _WAITLIST_WORD.finditer(page):
+            waitlist = _find_waitlist(_text(page[max(0, match.start() - WINDOW // 2):match.end() + 20]))
+            if waitlist is not None:
+                break
+    
+    return enrolled_capacity, waitlist
+
+
+def extract_seat_counts(page: str) -> Optional[dict[str, int]]:
+    """
+    Extract seat counts from a page with an "enrollment" block, e.g.
+    <div class="enrollment">Enrolled: 93/100 Waitlist: 5/10</div>
+    
+    Returns:
+        Dictionary with seats_total, seats_enrolled, waitlist_total and
+        waitlist_enrolled, or None if the block or enrolled count is missing
+    """
+    block = _SEATS_BLOCK.search(page)
+    if not block:
+        return None
+    
+    end = page.find("</div>", block.end())
+    if end == -1:
+        end = block.end() + WINDOW
+    text = _text(page[block.end():end])
+    
+    enrolled_match = _SEATS_ENROLLED.search(text)
+    if not enrolled_match:
+        return None
+    
+    seats_data = {
+        'seats_total': int(enrolled_match.group(2)),
+        'seats_enrolled': int(enrolled_match.group(1)),
+        'waitlist_total': 0,
+        'waitlist_enrolled': 0
+    }
+    
+    waitlist_match = _SEATS_WAITLIST.search(text)
+    if waitlist_match:
+        seats_data['waitlist_enrolled'] = int(waitlist_match.group(1))
+        seats_data['waitlist_total'] = int(waitlist_match.group(2))
+    
+    return seats_data
@@ -0,0 +1,197 @@
+"""
+CourSys Enrollment Source.
+Fetches enrollment for CourSys offerings from their browse/info/{offering}
+pages. A process shares one source (get_enrollment_source()); lookups
+for one pass go through an EnrollmentCycle, so each offering costs one
+request however many sections share it.
+
+The pages are the only CourSys source whose enrollment format we have
+real samples of (data/coursys_pages); the ?data=yes JSON is only known
+to carry the description (routers/prerequisites.py).
+"""
+import asyncio
+import logging
+import re
+from typing import Iterable, Optional, Union
+
+import httpx
+
+from config import settings
+from services.enrollment_extractor import extract_enrollment
+from services.http_client import get_http_client
+from services.resilience import Stale, resilient_get
+
+logger = logging.getLogger(__name__)
+
+# (enrolled/capacity, waitlist), e.g. ("161/331", "39")
+EnrollmentPair = tuple[Optional[str], Optional[str]]
+EnrollmentResult = Union[EnrollmentPair, Stale]
+
+
+def build_coursys_id(year: str, term: str, dept: str, course_number: str, section: str) -> str:
+    """
+    Build the CourSys offering id for a section.
+    
+    Example: ("2025", "fall", "cmpt", "120", "D101") -> "2025fa-cmpt-120-d1"
+    """
+    # Convert term format: "2025/fall" -> "2025fa"
+    term_map = {
+        'spring': 'sp',
+        'summer': 'su',
+        'fall': 'fa'
+    }
+    
+    term_code = term_map.get(term.lower(), term[:2])
+    
+    # Convert section format: "D100" -> "d1", "D101" -> "d1", "D200" -> "d2"
+    # Take first letter + first digit only
+    section_code = section.lower()
+    if len(section_code) >= 2:
+        match = re.match(r'^([a-z])(\d)', section_code)
+        if match:
+            section_code = match.group(1) + match.group(2)
+    
+    return f"{year}{term_code}-{dept.lower()}-{course_number.lower()}-{section_code}"
+
+
+def plan_enrollment_requests(
+    year: str,
+    term: str,
+    sections: Iterable[tuple[str, str, str]]
+) -> dict[str, list[tuple[str, str, str]]]:
+    """
+    Group (dept, course_number, section) requests by CourSys offering id.
+    
+    Example: CMPT 120 D100 and D101 both resolve to "2025fa-cmpt-120-d1",
+    so that page only needs fetching once for both sections.
+    """
+    plan: dict[str, list[tuple[str, str, str]]] = {}
+    for dept, course_number, section in sections:
+        offering_id = build_coursys_id(year, term, dept, course_number, section)
+        plan.setdefault(offering_id, []).append((dept, course_number, section))
+    return plan
+
+
+class CourSysEnrollmentSource:
+    """
+    Enrollment lookups against CourSys browse/info pages.
+    
+    Concurrent lookups for the same offering share one request, but
+    nothing is kept once it completes, so a source can live as long as
+    the process. Callers that want each offering fetched at most once
+    per pass (a worker cycle, a crawl) look up through cycle().
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ):
+        """
+        Args:
+            base_url: browse/info URL, e.g. "https://coursys.sfu.ca/browse/info"
+            client: HTTP client to use (defaults to the shared pooled client)
+            semaphore: Bounds in-flight requests, shared with the caller
+        """
+        self.base_url = base_url
+        self._client = client
+        self.semaphore = semaphore
+        self.requests = 0
+        self._in_flight: dict[str, asyncio.Future] = {}
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client if self._client is not None else get_http_client()
+    
+    async def _get(self, url: str) -> httpx.Response:
+        self.requests += 1
+        return await resilient_get(self.client, url, self.semaphore, timeout=10)
+    
+    def cycle(self) -> "EnrollmentCycle":
+        """Start a pass over CourSys in which each offering is fetched once."""
+        return EnrollmentCycle(self)
+    
+    async def fetch(self, offering_id: str) -> EnrollmentResult:
+        """
+        Enrollment for one offering, as of now.
+        
+        Returns:
+            Tuple of (enrolled/capacity, waitlist); (None, None) if CourSys
+            has no such offering; Stale if CourSys could not be reached
+        """
+        future = self._in_flight.get(offering_id)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(offering_id))
+            self._in_flight[offering_id] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(offering_id, None))
+        
+        # A cancelled caller must not cancel the fetch others are waiting on
+        return await asyncio.shield(future)
+    
+    async def _fetch(self, offering_id: str) -> EnrollmentResult:
+        try:
+            response = await self._get(f"{self.base_url}/{offering_id}")
+            
+            if response.status_code == 404:
+                return None, None
+            if response.status_code != 200:
+                return Stale(f"CourSys returned {response.status_code}")
+            
+            return extract_enrollment(response.text)
+        
+        except Exception as e:
+            logger.warning(f"Could not fetch enrollment for {offering_id} from CourSys: {e}")
+            return Stale(str(e))
+    
+    async def fetch_many(self, offering_ids: Iterable[str]) -> dict[str, EnrollmentResult]:
+        """
+        Enrollment for several offerings, fetched concurrently.
+        
+        Each distinct offering is requested once.
+        """
+        unique_ids = list(dict.fromkeys(offering_ids))
+        results = await asyncio.gather(*[self.fetch(offering_id) for offering_id in unique_ids])
+        return dict(zip(unique_ids, results))
+
+
+class EnrollmentCycle:
+    """
+    One pass of enrollment lookups through a CourSysEnrollmentSource.
+    
+    Sections like D100, D101 and D102 share one offering ("d1"); within a
+    cycle their lookups, concurrent or not, all share one fetch.
+    """
+    
+    def __init__(self, source: CourSysEnrollmentSource):
+        self.source = source
+        self._fetched: dict[str, asyncio.Future] = {}
+    
+    async def fetch(self, offering_id: str) -> EnrollmentResult:
+        """Enrollment for one offering, fetched at most once per cycle."""
+        future = self._fetched.get(offering_id)
+        if future is None:
+            future = asyncio.ensure_future(self.source.fetch(offering_id))
+            self._fetched[offering_id] = future
+        
+        return await asyncio.shield(future)
+    
+    async def fetch_many(self, offering_ids: Iterable[str]) -> dict[str, EnrollmentResult]:
+        """Enrollment for several offerings, fetched concurrently."""
+        unique_ids = list(dict.fromkeys(offering_ids))
+        results = await asyncio.gather(*[self.fetch(offering_id) for offering_id in unique_ids])
+        return dict(zip(unique_ids, results))
+
+
+# Global source instance
+_source_instance: CourSysEnrollmentSource | None = None
+
+
+def get_enrollment_source() -> CourSysEnrollmentSource:
+    """Get or create the global CourSys enrollment source."""
+    global _source_instance
+    
+    if _source_instance is None:
+        _source_instance = CourSysEnrollmentSource(f"{settings.COURSYS_BASE_URL}/browse/info")
+    
+    return _source_instance
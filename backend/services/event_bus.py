@@ -0,0 +1,232 @@
+"""
+Seat Event Bus.
+Carries seat changes from the process that found them to every API process,
+where the local SeatEventHub hands them to the subscribed clients.
+
+InProcessBus delivers straight to this process's hub, which is all a single
+node needs. RedisBus publishes each cycle's changes as one message on a
+Redis pub/sub channel and every process (the publisher included) delivers
+what it receives to its own hub. It speaks the Redis protocol directly, so
+any Redis-compatible server works, including scripts/pubsub_standin.py.
+
+Live updates are best-effort: if the bus is unreachable changes are dropped
+and logged, and clients catch up from the snapshot when they reconnect.
+"""
+import abc
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from services.seat_events import SeatChange, SeatEventHub, get_event_hub
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reconnect attempts of a Redis subscriber
+RECONNECT_DELAY = 2.0
+
+# Longest a publish may hold up the seat check cycle
+PUBLISH_TIMEOUT = 2.0
+
+
+class EventBus(abc.ABC):
+    """Publish/subscribe transport for seat changes."""
+    
+    async def start(self, listen: bool = True) -> None:
+        """
+        Args:
+            listen: Deliver received changes to this process's hub; worker-only
+                processes have no clients and can skip it
+        """
+    
+    async def stop(self) -> None:
+        pass
+    
+    @abc.abstractmethod
+    async def publish(self, changes: list[SeatChange]) -> None:
+        """Deliver changes to every process's hub; errors are logged, not raised."""
+
+
+class InProcessBus(EventBus):
+    """Single-process bus: publishing delivers to the local hub."""
+    
+    async def publish(self, changes: list[SeatChange]) -> None:
+        get_event_hub().publish(changes)
+
+
+def _encode_command(*args: str) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg.encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP reply."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by event bus server")
+    
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise ConnectionError(f"Event bus server error: {rest.decode()}")
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        return [await _read_reply(reader) for _ in range(int(rest))]
+    
+    raise ConnectionError(f"Unexpected reply from event bus server: {line!r}")
+
+
+class RedisBus(EventBus):
+    """Redis pub/sub bus, one channel for all seat changes."""
+    
+    def __init__(self, url: str, channel: str, hub: Optional[SeatEventHub] = None):
+        """
+        Args:
+            url: redis://[:password@]host:port
+            channel: Pub/sub channel name
+            hub: Where received changes go (defaults to the global hub)
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.channel = channel
+        self._hub = hub
+        
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._publish_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+    
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(_encode_command("AUTH", self.password))
+            await writer.drain()
+            await _read_reply(reader)
+        return reader, writer
+    
+    async def start(self, listen: bool = True) -> None:
+        if listen and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Seat event bus: redis://{self.host}:{self.port} channel {self.channel}")
+    
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    async def publish(self, changes: list[SeatChange]) -> None:
+        if not changes:
+            return
+        
+        message = json.dumps([change.to_dict() for change in changes], separators=(",", ":"))
+        
+        async with self._publish_lock:
+            try:
+                await asyncio.wait_for(self._publish(message), PUBLISH_TIMEOUT)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                logger.warning(f"Could not publish {len(changes)} seat changes: {e!r}")
+                if self._writer is not None:
+                    self._writer.close()
+                self._reader = self._writer = None
+    
+    async def _publish(self, message: str) -> None:
+        if self._writer is None:
+            self._reader, self._writer = await self._connect()
+        self._writer.write(_encode_command("PUBLISH", self.channel, message))
+        await self._writer.drain()
+        await _read_reply(self._reader)
+    
+    async def _listen(self) -> None:
+        """Subscribe and deliver received changes to the local hub, reconnecting on errors."""
+        hub = self._hub or get_event_hub()
+        
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                writer.write(_encode_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                
+                while True:
+                    reply = await _read_reply(reader)
+                    if not isinstance(reply, list) or len(reply) != 3 or reply[0] != "message":
+                        continue
+                    try:
+                        changes = [SeatChange.from_dict(data) for data in json.loads(reply[2])]
+                    except (ValueError, TypeError, KeyError) as e:
+                        logger.warning(f"Ignoring malformed seat change message: {e}")
+                        continue
+                    hub.publish(changes)
+            
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+                logger.warning(f"Seat event bus subscription lost ({e}); reconnecting in {RECONNECT_DELAY:g}s")
+            finally:
+                if writer is not None:
+                    writer.close()
+            
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+def create_event_bus(url: str, channel: str) -> EventBus:
+    """Bus for a URL: empty for in-process, redis:// for Redis pub/sub."""
+    if not url:
+        return InProcessBus()
+    
+    scheme = urlparse(url).scheme
+    if scheme in ("redis", "tcp"):
+        return RedisBus(url, channel)
+    
+    raise ValueError(f"Unsupported EVENT_BUS_URL scheme: {scheme}")
+
+
+# Global bus instance
+_bus_instance: EventBus | None = None
+
+
+def get_event_bus() -> EventBus:
+    """Get or create the global event bus from EVENT_BUS_URL."""
+    global _bus_instance
+    
+    if _bus_instance is None:
+        _bus_instance = create_event_bus(settings.EVENT_BUS_URL, settings.EVENT_BUS_CHANNEL)
+    
+    return _bus_instance
+
+
+async def start_event_bus(listen: bool = True) -> None:
+    """Connect the event bus."""
+    bus = get_event_bus()
+    if not listen and isinstance(bus, InProcessBus):
+        # A worker-only process has no clients of its own to deliver to
+        logger.warning(
+            "EVENT_BUS_URL is not set; seat changes found by this worker "
+            "will not reach live clients in the API processes"
+        )
+    await bus.start(listen)
+
+
+async def stop_event_bus() -> None:
+    """Disconnect the event bus."""
+    await get_event_bus().stop()
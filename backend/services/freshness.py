@@ -0,0 +1,176 @@
+"""
+Freshness-Priority Scheduling.
+Decides which watched sections to check when the upstream request budget
+doesn't cover all of them, favouring the ones most likely to have changed
+and that the most people are waiting on.
+"""
+import heapq
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Minutes of staleness assumed for a section that has never been checked
+NEVER_CHECKED_MINUTES = 24 * 60
+
+# Days before the add deadline during which checks are boosted
+DEADLINE_WINDOW_DAYS = 14
+
+
+@dataclass
+class SectionSignals:
+    """Inputs to a section's freshness score."""
+    
+    section_id: int
+    watchers: int
+    seats_total: int
+    seats_enrolled: int
+    waitlist_total: int = 0
+    waitlist_enrolled: int = 0
+    last_checked_at: Optional[datetime] = None
+    last_changed_at: Optional[datetime] = None
+    deadline: Optional[date] = None
+    # Upstream fetch that covers the section; sections sharing one are
+    # charged to the request budget once. None charges the section alone.
+    fetch_key: Optional[str] = None
+
+
+def deadline_for_term(term: str) -> Optional[date]:
+    """Last day to add for a term ("Spring 2026"), from ENROLLMENT_DEADLINES."""
+    value = settings.ENROLLMENT_DEADLINES.get(term)
+    if not value:
+        return None
+    
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid enrollment deadline for {term}: {value}")
+        return None
+
+
+def freshness_score(signals: SectionSignals, now: Optional[datetime] = None) -> float:
+    """
+    Priority of checking a section now; higher means check sooner.
+    
+    Staleness (minutes since the last check) is multiplied by how much a
+    change would matter (watchers) and how likely one is (fill ratio,
+    waitlist pressure, recent changes, an approaching add deadline). Since
+    staleness keeps growing, low-priority sections are never starved.
+    """
+    now = now or datetime.utcnow()
+    
+    if signals.last_checked_at is None:
+        staleness = NEVER_CHECKED_MINUTES
+    else:
+        staleness = max(0.0, (now - signals.last_checked_at).total_seconds() / 60)
+    
+    # Diminishing returns: the 50th watcher matters less than the 2nd
+    importance = 1 + math.log1p(signals.watchers)
+    
+    capacity = max(1, signals.seats_total)
+    fill_ratio = min(1.0, signals.seats_enrolled / capacity)
+    waitlist_pressure = min(1.0, signals.waitlist_enrolled / capacity)
+    
+    # A section that changed recently is likely to change again
+    if signals.last_changed_at is None:
+        volatility = 0.0
+    else:
+        hours_since_change = max(0.0, (now - signals.last_changed_at).total_seconds() / 3600)
+        volatility = math.exp(-hours_since_change / 24)
+    
+    likelihood = 1 + fill_ratio + waitlist_pressure + volatility
+    
+    urgency = 1.0
+    if signals.deadline is not None:
+        days_left = (signals.deadline - now.date()).days
+        if 0 <= days_left <= DEADLINE_WINDOW_DAYS:
+            urgency = 1 + 2 / (1 + days_left)
+    
+    return staleness * importance * likelihood * urgency
+
+
+def next_interval(
+    current: Optional[float],
+    changed: bool,
+    full_and_watched: bool = False
+) -> float:
+    """
+    Polling interval in seconds after a check.
+    
+    Halves on a change and grows by half again on each unchanged check,
+    between SEAT_CHECK_MIN_INTERVAL_MINUTES and SEAT_CHECK_MAX_INTERVAL_MINUTES.
+    A full section with watchers never backs off past the base
+    SEAT_CHECK_INTERVAL_MINUTES, since a single drop is what they wait for.
+    """
+    base = settings.SEAT_CHECK_INTERVAL_MINUTES * 60
+    low = settings.SEAT_CHECK_MIN_INTERVAL_MINUTES * 60
+    high = max(low, settings.SEAT_CHECK_MAX_INTERVAL_MINUTES * 60)
+    
+    interval = current or base
+    interval = interval / 2 if changed else interval * 1.5
+    
+    if full_and_watched:
+        high = min(high, max(low, base))
+    
+    return min(high, max(low, interval))
+
+
+class FreshnessScheduler:
+    """
+    Spends a fixed per-cycle request budget on the highest-scoring sections.
+    
+    The budget counts planned fetches, not sections: once a section's
+    fetch_key is charged, every other section sharing it is checked free.
+    """
+    
+    def __init__(self, budget: Optional[int] = None):
+        """
+        Args:
+            budget: Fetches to plan per cycle. Defaults to
+                SEAT_CHECK_REQUEST_BUDGET; 0 or less means no limit.
+        """
+        self.budget = settings.SEAT_CHECK_REQUEST_BUDGET if budget is None else budget
+    
+    def select(
+        self,
+        candidates: Iterable[SectionSignals],
+        now: Optional[datetime] = None
+    ) -> list[SectionSignals]:
+        """
+        Pick the sections to check this cycle.
+        
+        Once the budget is spent, lower-priority sections are still taken
+        if their fetch is already planned.
+        
+        Returns:
+            Sections covered by up to `budget` fetches, highest priority first
+        """
+        now = now or datetime.utcnow()
+        
+        queue = [
+            (-freshness_score(signals, now), signals.section_id, signals)
+            for signals in candidates
+        ]
+        
+        if self.budget <= 0:
+            return [signals for _, _, signals in sorted(queue)]
+        
+        heapq.heapify(queue)
+        
+        charged: set = set()
+        selected = []
+        while queue:
+            signals = heapq.heappop(queue)[2]
+            key = signals.section_id if signals.fetch_key is None else signals.fetch_key
+            if key not in charged:
+                if len(charged) >= self.budget:
+                    continue
+                charged.add(key)
+            selected.append(signals)
+        
+        return selected
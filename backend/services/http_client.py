@@ -0,0 +1,74 @@
+"""
+Shared HTTP Client.
+Provides a long-lived, pooled httpx.AsyncClient for all upstream calls so
+connections (and TLS sessions) are reused instead of re-opened per request.
+"""
+import logging
+from typing import Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Global client instance
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """Check whether the optional 'h2' package is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_http_client(timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """
+    Create a new pooled client configured from settings.
+    
+    Args:
+        timeout: Request timeout in seconds. Defaults to CRAWLER_TIMEOUT.
+    """
+    http2 = settings.HTTP2_ENABLED
+    if http2 and not _http2_available():
+        logger.warning("HTTP2_ENABLED is set but 'h2' is not installed; falling back to HTTP/1.1")
+        http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+    )
+    
+    return httpx.AsyncClient(
+        timeout=timeout if timeout is not None else settings.CRAWLER_TIMEOUT,
+        limits=limits,
+        http2=http2,
+        headers={"User-Agent": settings.HTTP_USER_AGENT},
+        follow_redirects=True
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the global shared client."""
+    global _client
+    
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        logger.info("Shared HTTP client created")
+    
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the global shared client and release its connections."""
+    global _client
+    
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Shared HTTP client closed")
+    
+    _client = None
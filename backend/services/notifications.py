@@ -0,0 +1,330 @@
+"""
+Seat Alert Notifications.
+Queues seat alerts from the worker and delivers them in the background.
+
+The seat check only enqueues; sending happens in separate tasks so a slow
+mail server never delays a cycle. Alerts for one user are coalesced for
+ALERT_COALESCE_SECONDS and go out as a single email listing every section
+that opened, and a section isn't alerted to the same user again within
+ALERT_DEDUPE_MINUTES. A term-start burst therefore costs one email per
+user rather than one per watcher.
+"""
+import abc
+import asyncio
+import logging
+import random
+import smtplib
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SeatAlert:
+    """One section that opened up for one watcher."""
+    
+    user_email: str
+    section_id: int
+    dept: str
+    number: str
+    title: str
+    section_code: str
+    term: str
+    instructor: Optional[str]
+    seats_available: int
+    seats_total: int
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    
+    def describe(self) -> str:
+        return (
+            f"{self.dept} {self.number} - {self.title}\n"
+            f"   Section: {self.section_code}\n"
+            f"   Term: {self.term}\n"
+            f"   Seats Available: {self.seats_available}/{self.seats_total}\n"
+            f"   Instructor: {self.instructor or 'TBD'}\n"
+        )
+
+
+def compose_email(alerts: list[SeatAlert]) -> tuple[str, str]:
+    """
+    Subject and body of the email for one user's alerts.
+    
+    Returns:
+        Tuple of (subject, body)
+    """
+    if len(alerts) == 1:
+        alert = alerts[0]
+        subject = f"Seats Available: {alert.dept} {alert.number} {alert.section_code}"
+    else:
+        subject = f"Seats Available in {len(alerts)} sections you're watching"
+    
+    body = "Seats opened up in:\n\n" + "\n".join(alert.describe() for alert in alerts)
+    return subject, body
+
+
+class NotificationTransport(abc.ABC):
+    """Delivers one composed email."""
+    
+    @abc.abstractmethod
+    async def send(self, to: str, subject: str, body: str) -> None:
+        """Send one email, raising on failure so the dispatcher can retry."""
+
+
+class LogTransport(NotificationTransport):
+    """Logs alerts instead of sending them; used while SMTP isn't configured."""
+    
+    async def send(self, to: str, subject: str, body: str) -> None:
+        logger.info(f"🔔 ALERT SENT to {to}\n   {subject}\n{body}")
+
+
+class SMTPTransport(NotificationTransport):
+    """Sends email through an SMTP server, one connection per email."""
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+    
+    def _send_sync(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+    
+    async def send(self, to: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+        
+        # smtplib blocks; keep it off the event loop
+        await asyncio.to_thread(self._send_sync, message)
+
+
+def get_transport() -> NotificationTransport:
+    """Transport chosen by the SMTP settings."""
+    if not settings.SMTP_HOST:
+        return LogTransport()
+    
+    return SMTPTransport(
+        host=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        sender=settings.ALERT_FROM_EMAIL,
+        username=settings.SMTP_USERNAME,
+        password=settings.SMTP_PASSWORD,
+        use_tls=settings.SMTP_USE_TLS
+    )
+
+
+class NotificationDispatcher:
+    """
+    Background delivery of seat alerts.
+    
+    enqueue() never blocks: it adds the alert to the user's pending batch
+    and, for the first alert in a batch, schedules the batch to become
+    ready after the coalescing window. Sender tasks take ready users off
+    an asyncio queue and send one email per user, with retries.
+    """
+    
+    def __init__(
+        self,
+        transport: Optional[NotificationTransport] = None,
+        senders: Optional[int] = None,
+        coalesce_seconds: Optional[float] = None,
+        dedupe_seconds: Optional[float] = None,
+        attempts: Optional[int] = None
+    ):
+        """
+        Args:
+            transport: Delivery mechanism (defaults to get_transport())
+            senders: Emails sent at once (defaults to ALERT_SEND_CONCURRENCY)
+            coalesce_seconds: Batching window per user (defaults to ALERT_COALESCE_SECONDS)
+            dedupe_seconds: Repeat suppression per user and section
+                (defaults to ALERT_DEDUPE_MINUTES)
+            attempts: Tries per email (defaults to ALERT_SEND_ATTEMPTS)
+        """
+        self.transport = transport or get_transport()
+        self.senders = max(1, senders or settings.ALERT_SEND_CONCURRENCY)
+        self.coalesce_seconds = settings.ALERT_COALESCE_SECONDS if coalesce_seconds is None else coalesce_seconds
+        self.dedupe_seconds = settings.ALERT_DEDUPE_MINUTES * 60 if dedupe_seconds is None else dedupe_seconds
+        self.attempts = max(1, attempts or settings.ALERT_SEND_ATTEMPTS)
+        
+        self.stats = {"queued": 0, "deduplicated": 0, "emails_sent": 0, "alerts_sent": 0, "failed": 0}
+        
+        self._pending: dict[str, dict[int, SeatAlert]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._recent: dict[tuple[str, int], float] = {}
+        self._last_pruned = time.monotonic()
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+    
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+    
+    def start(self) -> None:
+        """Start the sender tasks on the running event loop."""
+        if self.is_running:
+            return
+        
+        self._ready = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._sender()) for _ in range(self.senders)]
+        
+        # Batches whose window closed before the senders existed
+        for user_email in self._pending:
+            if user_email not in self._timers:
+                self._ready.put_nowait(user_email)
+        
+        logger.info(f"Notification dispatcher started ({type(self.transport).__name__}, {self.senders} senders)")
+    
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Send everything still pending, then stop the sender tasks."""
+        if not self.is_running:
+            return
+        
+        for user_email in list(self._timers):
+            self._timers.pop(user_email).cancel()
+            self._ready.put_nowait(user_email)
+        
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Gave up on {self._ready.qsize()} pending alert emails at shutdown")
+        
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Notification dispatcher stopped")
+    
+    def enqueue(self, alert: SeatAlert) -> bool:
+        """
+        Queue an alert without waiting for it to be sent.
+        
+        Returns:
+            False if the same section was alerted to this user within the
+            dedupe window, True otherwise
+        """
+        now = time.monotonic()
+        self._prune(now)
+        
+        pending = self._pending.setdefault(alert.user_email, {})
+        key = (alert.user_email, alert.section_id)
+        
+        if alert.section_id not in pending and now - self._recent.get(key, -self.dedupe_seconds) < self.dedupe_seconds:
+            self.stats["deduplicated"] += 1
+            if not pending:
+                del self._pending[alert.user_email]
+            return False
+        
+        # A newer alert for a pending section replaces it, so the email has the latest count
+        pending[alert.section_id] = alert
+        self._recent[key] = now
+        self.stats["queued"] += 1
+        
+        if alert.user_email not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[alert.user_email] = loop.call_later(
+                self.coalesce_seconds, self._mark_ready, alert.user_email
+            )
+        
+        return True
+    
+    def _mark_ready(self, user_email: str) -> None:
+        self._timers.pop(user_email, None)
+        if self._ready is None:
+            logger.warning(f"Notification dispatcher isn't running; holding alerts for {user_email}")
+            return
+        self._ready.put_nowait(user_email)
+    
+    def _prune(self, now: float) -> None:
+        """Forget dedupe entries that have expired, at most once per window."""
+        if now - self._last_pruned < self.dedupe_seconds:
+            return
+        
+        self._recent = {
+            key: at for key, at in self._recent.items()
+            if now - at < self.dedupe_seconds
+        }
+        self._last_pruned = now
+    
+    async def _sender(self) -> None:
+        while True:
+            user_email = await self._ready.get()
+            try:
+                alerts = list(self._pending.pop(user_email, {}).values())
+                if alerts:
+                    await self._deliver(user_email, alerts)
+            except Exception as e:
+                logger.error(f"Error sending alerts to {user_email}: {e}", exc_info=True)
+            finally:
+                self._ready.task_done()
+    
+    async def _deliver(self, user_email: str, alerts: list[SeatAlert]) -> None:
+        """Send one email with retries and jittered exponential backoff."""
+        subject, body = compose_email(alerts)
+        
+        for attempt in range(1, self.attempts + 1):
+            try:
+                await self.transport.send(user_email, subject, body)
+                self.stats["emails_sent"] += 1
+                self.stats["alerts_sent"] += len(alerts)
+                return
+            except Exception as e:
+                if attempt == self.attempts:
+                    self.stats["failed"] += len(alerts)
+                    logger.error(f"Failed to send {len(alerts)} alerts to {user_email} after {attempt} attempts: {e}")
+                    # Let the next opening for these sections try again
+                    for alert in alerts:
+                        self._recent.pop((user_email, alert.section_id), None)
+                    return
+                
+                delay = random.uniform(0, 2 ** attempt)
+                logger.warning(f"Sending alerts to {user_email} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+# Global dispatcher instance
+_dispatcher_instance: NotificationDispatcher | None = None
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Get or create the global notification dispatcher."""
+    global _dispatcher_instance
+    
+    if _dispatcher_instance is None:
+        _dispatcher_instance = NotificationDispatcher()
+    
+    return _dispatcher_instance
+
+
+def start_dispatcher() -> None:
+    """Start delivering queued alerts."""
+    get_dispatcher().start()
+
+
+async def stop_dispatcher() -> None:
+    """Flush pending alerts and stop delivering."""
+    await get_dispatcher().stop()
@@ -3,6 +3,7 @@ Prerequisite Logic Parser V2 - Correct handling of comma-separated lists.
 Converts prerequisite strings into structured boolean trees.
 """
 import re
+import sys
 import logging
 from typing import Optional, Any
 
@@ -38,8 +39,9 @@ class PrerequisiteParser:
             # Parse the expression
             tree = self._parse_expression(prereq_string)
             
-            return tree
-            
+            # Simplify into a minimal, evaluation-friendly tree
+            return self.normalize(tree)
+        
         except Exception as e:
             logger.error(f"Error parsing prerequisite '{prereq_string}': {e}")
             return None
@@ -179,6 +181,124 @@ class PrerequisiteParser:
             # No courses found
             return {"type": "UNKNOWN", "expression": expr}
     
+    def normalize(self, tree: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        """
+        Simplify a parsed tree into its minimal equivalent form.
+        
+        - Nested AND-in-AND / OR-in-OR nodes are flattened
+        - Single-child groups are collapsed into the child
+        - Duplicate children are removed
+        - Children are ordered so cheap leaves are evaluated first
+        - UNKNOWN leaves that must hold alongside the rest (AND) are moved
+          out of the boolean tree into a "requirements" list on the root
+          node; UNKNOWN alternatives (OR) stay in the tree, so "X or
+          permission of the instructor" still reads as an alternative
+        
+        A tree made only of UNKNOWN leaves is kept as a single UNKNOWN node.
+        """
+        if not tree:
+            return None
+        
+        requirements: list[str] = []
+        simplified = self._simplify(tree, requirements)
+        
+        if simplified is None:
+            if not requirements:
+                return None
+            return {"type": "UNKNOWN", "expression": "; ".join(requirements)}
+        
+        if requirements:
+            simplified["requirements"] = requirements
+        
+        return simplified
+    
+    def _simplify(
+        self,
+        node: Optional[dict[str, Any]],
+        requirements: list[str],
+        parent_type: Optional[str] = None
+    ) -> Optional[dict[str, Any]]:
+        """Recursively simplify a node, collecting UNKNOWN expressions required alongside it."""
+        if not node:
+            return None
+        
+        node_type = node.get("type")
+        
+        if node_type == "COURSE":
+            return {"type": "COURSE", "course": node["course"]}
+        
+        if node_type not in ("AND", "OR"):
+            expression = node.get("expression", "")
+            if not expression:
+                return None
+            if parent_type == "OR":
+                # An alternative; lifting it out would turn "or" into "and"
+                return {"type": "UNKNOWN", "expression": expression}
+            if expression not in requirements:
+                requirements.append(expression)
+            return None
+        
+        children: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        
+        for child in node.get("children", []):
+            simplified = self._simplify(child, requirements, node_type)
+            if simplified is None:
+                continue
+            
+            # Flatten associative nodes (AND inside AND, OR inside OR)
+            if simplified["type"] == node_type:
+                candidates = simplified["children"]
+            else:
+                candidates = [simplified]
+            
+            for candidate in candidates:
+                key = self._node_key(candidate)
+                if key not in seen:
+                    seen.add(key)
+                    children.append(candidate)
+        
+        if not children:
+            return None
+        if len(children) == 1:
+            return children[0]
+        
+        children.sort(key=self._selectivity_key)
+        return {"type": node_type, "children": children}
+    
+    def _node_key(self, node: dict[str, Any]) -> str:
+        """Canonical string for a simplified node, used for de-duplication."""
+        if node["type"] == "COURSE":
+            return node["course"]
+        if node["type"] == "UNKNOWN":
+            return f"UNKNOWN({node['expression']})"
+        
+        child_keys = sorted(self._node_key(child) for child in node["children"])
+        return f"{node['type']}({','.join(child_keys)})"
+    
+    def _selectivity_key(self, node: dict[str, Any]) -> tuple[int, str]:
+        """
+        Sort key for sibling nodes.
+        
+        Single course leaves are a set lookup, so they come first and let
+        AND fail / OR succeed before any subtree is walked. Subtrees follow
+        in order of size, and UNKNOWN alternatives, which can't be checked,
+        come last.
+        """
+        if node["type"] == "COURSE":
+            return 0, node["course"]
+        if node["type"] == "UNKNOWN":
+            return sys.maxsize, self._node_key(node)
+        return self._node_size(node), self._node_key(node)
+    
+    def _node_size(self, node: dict[str, Any]) -> int:
+        """Number of course leaves under a node."""
+        if node["type"] == "COURSE":
+            return 1
+        if node["type"] == "UNKNOWN":
+            return 0
+        return sum(self._node_size(child) for child in node["children"])
+    
     def _split_respecting_parens(self, expr: str, delimiter: str) -> list[str]:
         """Split expression by delimiter, respecting parentheses."""
         parts = []
@@ -0,0 +1,147 @@
+"""
+Upstream Rate Limiting.
+One token bucket per upstream host, shared by the crawler, the worker and
+live API routes so combined traffic never exceeds the configured rate.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket limiter usable from both async and sync code.
+    
+    Callers reserve a token up front and then sleep until it is due, so
+    concurrent callers are spaced out at `rate` per second with at most
+    `capacity` requests let through in a burst.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second. 0 or less disables limiting.
+            capacity: Maximum tokens that can accumulate (burst size).
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens (possibly going into debt) and return seconds to wait."""
+        if self.rate <= 0:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+            
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens only if they are available right now."""
+        if self.rate <= 0:
+            return True
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+    
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait asynchronously until `tokens` are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def acquire_blocking(self, tokens: float = 1.0) -> None:
+        """Block the current thread until `tokens` are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Limiter names for each upstream
+OUTLINES = "outlines"
+COURSYS = "coursys"
+RMP = "rmp"
+
+# Global limiter instances
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_config() -> dict[str, tuple[float, float]]:
+    """Rate and burst per upstream, from settings."""
+    return {
+        OUTLINES: (settings.OUTLINES_RATE_LIMIT, settings.OUTLINES_RATE_BURST),
+        COURSYS: (settings.COURSYS_RATE_LIMIT, settings.COURSYS_RATE_BURST),
+        RMP: (settings.RMP_RATE_LIMIT, settings.RMP_RATE_BURST),
+    }
+
+
+def _host_map() -> dict[str, str]:
+    """Map upstream hostnames to limiter names."""
+    return {
+        urlparse(settings.SFU_API_BASE_URL).hostname or "": OUTLINES,
+        "www.sfu.ca": OUTLINES,
+        urlparse(settings.COURSYS_BASE_URL).hostname or "": COURSYS,
+        urlparse(settings.SFU_COURYS_BASE_URL).hostname or "": COURSYS,
+        "www.ratemyprofessors.com": RMP,
+    }
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """Get or create the shared limiter for an upstream."""
+    with _limiters_lock:
+        if name not in _limiters:
+            rate, burst = _limiter_config()[name]
+            _limiters[name] = TokenBucket(rate, burst)
+            logger.debug(f"Created rate limiter '{name}' ({rate}/s, burst {burst})")
+        return _limiters[name]
+
+
+def rate_limiter_for_url(url: str) -> Optional[TokenBucket]:
+    """Get the shared limiter for the host of a URL, or None if unknown."""
+    name = _host_map().get(urlparse(url).hostname or "")
+    if name is None:
+        return None
+    return get_rate_limiter(name)
+
+
+async def throttle(url: str) -> None:
+    """Wait for the rate limiter of the URL's host, if it has one."""
+    limiter = rate_limiter_for_url(url)
+    if limiter:
+        await limiter.acquire()
+
+
+def throttle_blocking(url: str) -> None:
+    """Blocking variant of throttle() for sync clients."""
+    limiter = rate_limiter_for_url(url)
+    if limiter:
+        limiter.acquire_blocking()
@@ -0,0 +1,288 @@
+"""
+Upstream Resilience.
+Retries with jittered exponential backoff, per-host retry budgets and
+per-host circuit breakers for calls to SFU, CourSys and RateMyProfessors.
+
+When an upstream can't be reached, fetchers return a Stale marker instead
+of empty data so callers keep the last good values they already have.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from config import settings
+from services.rate_limiter import throttle
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying; anything else is returned to the caller as-is
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class Stale:
+    """
+    Result returned when fresh upstream data couldn't be obtained.
+    
+    Callers should keep whatever they last stored rather than overwrite
+    it. Falsy, so `if not result` treats it like a missing value.
+    """
+    
+    reason: str
+    
+    def __bool__(self) -> bool:
+        return False
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised without making a request while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream host.
+    
+    Closed: requests flow normally. After `failure_threshold` failures in
+    a row the circuit opens and requests fail immediately. Once
+    `reset_timeout` has passed a single trial request is let through
+    (half-open); its outcome closes or re-opens the circuit. A trial that
+    never reports back is replaced by a new one after another
+    `reset_timeout`.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                # Let one trial request through
+                self.state = self.HALF_OPEN
+                self._trial_at = now
+                return True
+            
+            if self.state == self.HALF_OPEN and now - self._trial_at >= self.reset_timeout:
+                # The last trial was lost without an outcome; try again
+                self._trial_at = now
+                return True
+            
+            return False
+    
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self.failures} failures; "
+                        f"failing fast for {self.reset_timeout:.0f}s"
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+    
+    def record_abandoned(self) -> None:
+        """A request was cancelled; a pending trial re-opens without counting a failure."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of requests for one host.
+    
+    Every request deposits `ratio` tokens and every retry spends one, so a
+    brownout can't multiply upstream load by the number of attempts.
+    """
+    
+    def __init__(self, ratio: float, capacity: float = 10.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+    
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+    
+    def try_spend(self) -> bool:
+        """Take a retry token if one is available."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+# Global per-host instances
+_breakers: dict[str, CircuitBreaker] = {}
+_budgets: dict[str, RetryBudget] = {}
+_registry_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Get or create the shared circuit breaker for a URL's host."""
+    host = _host(url)
+    with _registry_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(
+                host,
+                settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                settings.CIRCUIT_BREAKER_RESET_SECONDS
+            )
+        return _breakers[host]
+
+
+def get_retry_budget(url: str) -> RetryBudget:
+    """Get or create the shared retry budget for a URL's host."""
+    host = _host(url)
+    with _registry_lock:
+        if host not in _budgets:
+            _budgets[host] = RetryBudget(settings.UPSTREAM_RETRY_BUDGET_RATIO)
+        return _budgets[host]
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (1-based)."""
+    ceiling = min(
+        settings.UPSTREAM_RETRY_MAX_DELAY,
+        settings.UPSTREAM_RETRY_BASE_DELAY * (2 ** (attempt - 1))
+    )
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header, if present."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def resilient_get(
+    client: httpx.AsyncClient,
+    url: str,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    **kwargs: Any
+) -> httpx.Response:
+    """
+    Rate-limited GET with retries and a per-host circuit breaker.
+    
+    Transport errors and RETRYABLE_STATUS responses are retried with
+    jittered backoff while attempts and the host's retry budget last.
+    The semaphore, if given, is held only while a request is in flight,
+    not while backing off.
+    
+    Returns:
+        The last response; callers still check its status.
+    
+    Raises:
+        CircuitOpenError: The host's circuit is open.
+        httpx.TransportError: The final attempt failed to connect or timed out.
+    """
+    breaker = get_circuit_breaker(url)
+    budget = get_retry_budget(url)
+    budget.record_request()
+    attempt = 0
+    
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {breaker.name}")
+        
+        response: Optional[httpx.Response] = None
+        error: Optional[httpx.TransportError] = None
+        
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    await throttle(url)
+                    response = await client.get(url, **kwargs)
+            else:
+                await throttle(url)
+                response = await client.get(url, **kwargs)
+        except httpx.TransportError as e:
+            error = e
+        except Exception:
+            # Any other error still settles a half-open trial
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.record_abandoned()
+            raise
+        
+        if response is not None and response.status_code not in RETRYABLE_STATUS:
+            breaker.record_success()
+            return response
+        
+        if response is not None and response.status_code == 429:
+            # The host is up but pacing us: settles a half-open trial as a
+            # success, and never counts towards opening
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        
+        attempt += 1
+        if attempt >= settings.UPSTREAM_RETRY_ATTEMPTS or not budget.try_spend():
+            if response is not None:
+                return response
+            raise error
+        
+        delay = backoff_delay(attempt)
+        if response is not None:
+            retry_after = _retry_after(response) or 0.0
+            if retry_after > settings.UPSTREAM_RETRY_MAX_DELAY:
+                # Upstream asked for a longer pause than we're willing to wait
+                return response
+            delay = max(delay, retry_after)
+        
+        logger.debug(
+            f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1}): "
+            f"{error or response.status_code}"
+        )
+        await asyncio.sleep(delay)
@@ -5,6 +5,8 @@ Uses RMP's internal GraphQL endpoint to fetch professor ratings
 import requests
 from typing import Optional, Dict
 
+from services.rate_limiter import throttle_blocking
+
 class RMPClient:
     def __init__(self):
         self.graphql_url = "https://www.ratemyprofessors.com/graphql"
@@ -76,6 +78,7 @@ class RMPClient:
                 "variables": variables
             }
             
+            throttle_blocking(self.graphql_url)
             response = requests.post(
                 self.graphql_url,
                 json=payload,
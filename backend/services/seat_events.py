@@ -0,0 +1,151 @@
+"""
+Live Seat Events.
+Fans seat changes out to connected SSE and WebSocket clients in this
+process. Changes reach the hub through the event bus (services/event_bus.py),
+which carries them between processes when there are several.
+
+Subscribers are indexed by section id, so publishing a change touches only
+the clients watching that section. Each event is serialized once and every
+subscriber gets the same few-byte JSON string on its own bounded queue; a
+client that stops reading loses its oldest events rather than holding up
+the worker.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per client before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Sections one connection may subscribe to
+MAX_SECTIONS_PER_SUBSCRIBER = 500
+
+
+@dataclass
+class SeatChange:
+    """New seat counts for one section."""
+    
+    section_id: int
+    seats_total: int
+    seats_enrolled: int
+    waitlist_total: int
+    waitlist_enrolled: int
+    at: str = field(default_factory=lambda: datetime.utcnow().isoformat(timespec="seconds"))
+    
+    @property
+    def seats_available(self) -> int:
+        return max(0, self.seats_total - self.seats_enrolled)
+    
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "seats_available": self.seats_available}
+    
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SeatChange":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__})
+
+
+class Subscriber:
+    """One connected client: its sections and its pending events."""
+    
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.section_ids: set[int] = set()
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+    
+    def deliver(self, payload: str) -> None:
+        """Queue an event without waiting, dropping the oldest if full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(payload)
+
+
+class SeatEventHub:
+    """Subscription index and fan-out for seat changes in this process."""
+    
+    def __init__(self):
+        self._by_section: dict[int, set[Subscriber]] = {}
+        self.stats = {"published": 0, "delivered": 0}
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len({subscriber for subscribers in self._by_section.values() for subscriber in subscribers})
+    
+    def section_ids(self) -> set[int]:
+        """Sections at least one client is subscribed to."""
+        return set(self._by_section)
+    
+    def subscribe(self, subscriber: Subscriber, section_ids: Iterable[int]) -> set[int]:
+        """
+        Add sections to a subscriber, up to MAX_SECTIONS_PER_SUBSCRIBER.
+        
+        Returns:
+            The sections that were added
+        """
+        added = set()
+        for section_id in section_ids:
+            if len(subscriber.section_ids) >= MAX_SECTIONS_PER_SUBSCRIBER:
+                break
+            if section_id in subscriber.section_ids:
+                continue
+            subscriber.section_ids.add(section_id)
+            self._by_section.setdefault(section_id, set()).add(subscriber)
+            added.add(section_id)
+        return added
+    
+    def unsubscribe(self, subscriber: Subscriber, section_ids: Iterable[int]) -> None:
+        for section_id in section_ids:
+            subscriber.section_ids.discard(section_id)
+            subscribers = self._by_section.get(section_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._by_section[section_id]
+    
+    def remove(self, subscriber: Subscriber) -> None:
+        """Drop a disconnected client."""
+        self.unsubscribe(subscriber, list(subscriber.section_ids))
+    
+    def publish(self, changes: Iterable[SeatChange]) -> int:
+        """
+        Deliver changes to the clients subscribed to their sections.
+        
+        Returns:
+            Number of deliveries
+        """
+        delivered = 0
+        for change in changes:
+            self.stats["published"] += 1
+            subscribers = self._by_section.get(change.section_id)
+            if not subscribers:
+                continue
+            
+            payload = change.to_json()
+            for subscriber in subscribers:
+                subscriber.deliver(payload)
+            delivered += len(subscribers)
+        
+        self.stats["delivered"] += delivered
+        return delivered
+
+
+# Global hub instance
+_hub_instance: SeatEventHub | None = None
+
+
+def get_event_hub() -> SeatEventHub:
+    """Get or create the global seat event hub."""
+    global _hub_instance
+    
+    if _hub_instance is None:
+        _hub_instance = SeatEventHub()
+    
+    return _hub_instance
@@ -0,0 +1,231 @@
+"""
+Seat History.
+Time series of seat counts per section, stored as changes only.
+
+Each section's history starts with a keyframe row holding absolute
+counts; every later row holds only the difference from the previous
+observation and is written only when something changed. Seat counts move
+a few seats at a time, so the deltas are small integers (a byte or two
+each in SQLite) and an unchanged section costs nothing. Absolute values
+are rebuilt by summing forward from the nearest keyframe, and a new
+keyframe is written every KEYFRAME_EVERY changes.
+
+Old history is compacted: past SEAT_HISTORY_RAW_DAYS changes are merged
+into one row per hour, and past SEAT_HISTORY_RETENTION_DAYS they are
+folded into a single keyframe.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, select, func
+
+from models import SectionSeatHistory
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Counts tracked in the history, matching the Section columns
+HISTORY_FIELDS = ('seats_total', 'seats_enrolled', 'waitlist_total', 'waitlist_enrolled')
+
+# A fresh keyframe is written every this many changes, bounding how many
+# deltas a read has to sum
+KEYFRAME_EVERY = 50
+
+
+def keyframe_row(section_id: int, at: datetime, seats: dict[str, int]) -> dict[str, Any]:
+    """History row holding a section's absolute counts."""
+    return {
+        "section_id": section_id,
+        "recorded_at": at,
+        "keyframe": True,
+        **{name: seats[name] for name in HISTORY_FIELDS}
+    }
+
+
+def delta_row(
+    section_id: int,
+    at: datetime,
+    old: dict[str, int],
+    new: dict[str, int]
+) -> dict[str, Any]:
+    """History row holding the change between two observations."""
+    return {
+        "section_id": section_id,
+        "recorded_at": at,
+        "keyframe": False,
+        **{name: new[name] - old[name] for name in HISTORY_FIELDS}
+    }
+
+
+def write_history(session: Session, rows: list[dict[str, Any]]) -> None:
+    """Insert history rows in one executemany; the caller commits."""
+    if rows:
+        session.execute(insert(SectionSeatHistory), rows)
+
+
+def _hour(at: datetime) -> datetime:
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def _replay(rows: Iterable[SectionSeatHistory]) -> Iterable[tuple[SectionSeatHistory, dict[str, int]]]:
+    """
+    Yield each row with the absolute counts after applying it.
+    
+    Deltas before the first keyframe can't be resolved and are skipped.
+    """
+    seats: Optional[dict[str, int]] = None
+    for row in rows:
+        if row.keyframe:
+            seats = {name: getattr(row, name) for name in HISTORY_FIELDS}
+        elif seats is None:
+            continue
+        else:
+            seats = {name: seats[name] + getattr(row, name) for name in HISTORY_FIELDS}
+        yield row, seats
+
+
+def load_history(
+    session: Session,
+    section_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> list[dict[str, Any]]:
+    """
+    Absolute seat counts for a section at each recorded change.
+    
+    Reads from the last keyframe at or before `since` onwards, using the
+    (section_id, recorded_at) index, so the cost depends on the range asked
+    for rather than on the section's whole history.
+    
+    Returns:
+        List of {"recorded_at", seats_total, seats_enrolled, waitlist_total,
+        waitlist_enrolled} in time order
+    """
+    start = None
+    if since is not None:
+        start = session.exec(
+            select(func.max(SectionSeatHistory.recorded_at))
+            .where(SectionSeatHistory.section_id == section_id)
+            .where(SectionSeatHistory.keyframe == True)
+            .where(SectionSeatHistory.recorded_at <= since)
+        ).one()
+    
+    statement = (
+        select(SectionSeatHistory)
+        .where(SectionSeatHistory.section_id == section_id)
+        .order_by(SectionSeatHistory.recorded_at, SectionSeatHistory.id)
+    )
+    if start is not None:
+        statement = statement.where(SectionSeatHistory.recorded_at >= start)
+    if until is not None:
+        statement = statement.where(SectionSeatHistory.recorded_at <= until)
+    
+    return [
+        {"recorded_at": row.recorded_at, **seats}
+        for row, seats in _replay(session.exec(statement))
+        if since is None or row.recorded_at >= since
+    ]
+
+
+def compact_history(
+    session: Session,
+    now: Optional[datetime] = None,
+    since: Optional[datetime] = None
+) -> dict[str, int]:
+    """
+    Downsample and expire old history; the caller commits.
+    
+    Changes older than SEAT_HISTORY_RAW_DAYS are merged into one row per
+    section per hour. Rows older than SEAT_HISTORY_RETENTION_DAYS are
+    replaced by one keyframe holding the counts at that point, so newer
+    rows still add up to the right values.
+    
+    Args:
+        session: Database session
+        now: Current time
+        since: Only downsample rows recorded after this, e.g. the raw
+            cutoff of the previous run; None downsamples everything
+    
+    Returns:
+        Counts of rows merged away and rows expired
+    """
+    now = now or datetime.utcnow()
+    raw_cutoff = now - timedelta(days=settings.SEAT_HISTORY_RAW_DAYS)
+    retention_cutoff = now - timedelta(days=settings.SEAT_HISTORY_RETENTION_DAYS)
+    order = (SectionSeatHistory.section_id, SectionSeatHistory.recorded_at, SectionSeatHistory.id)
+    
+    delete_ids: list[int] = []
+    
+    # Expire: fold everything before the retention cutoff into one keyframe
+    expiring: dict[int, list[SectionSeatHistory]] = {}
+    for row in session.exec(
+        select(SectionSeatHistory)
+        .where(SectionSeatHistory.recorded_at < retention_cutoff)
+        .order_by(*order)
+    ):
+        expiring.setdefault(row.section_id, []).append(row)
+    
+    keyframes: list[dict[str, Any]] = []
+    expired = 0
+    for section_id, rows in expiring.items():
+        if len(rows) == 1 and rows[0].keyframe:
+            # Already folded by an earlier run
+            continue
+        
+        replayed = list(_replay(rows))
+        delete_ids.extend(row.id for row in rows)
+        if replayed:
+            last_row, seats = replayed[-1]
+            keyframes.append(keyframe_row(section_id, last_row.recorded_at, seats))
+            expired += len(rows) - 1
+        else:
+            expired += len(rows)
+    
+    # Downsample: merge runs of deltas within the same hour, never across a keyframe
+    statement = (
+        select(SectionSeatHistory)
+        .where(SectionSeatHistory.recorded_at >= retention_cutoff)
+        .where(SectionSeatHistory.recorded_at < raw_cutoff)
+        .order_by(*order)
+    )
+    if since is not None:
+        statement = statement.where(SectionSeatHistory.recorded_at >= since)
+    
+    merged_updates: list[dict[str, Any]] = []
+    merged = 0
+    bucket: list[SectionSeatHistory] = []
+    
+    def flush() -> None:
+        nonlocal merged
+        if len(bucket) > 1:
+            merged_updates.append({
+                "id": bucket[-1].id,
+                **{name: sum(getattr(item, name) for item in bucket) for name in HISTORY_FIELDS}
+            })
+            delete_ids.extend(item.id for item in bucket[:-1])
+            merged += len(bucket) - 1
+        bucket.clear()
+    
+    for row in session.exec(statement):
+        if bucket and (
+            row.keyframe
+            or row.section_id != bucket[0].section_id
+            or _hour(row.recorded_at) != _hour(bucket[0].recorded_at)
+        ):
+            flush()
+        if not row.keyframe:
+            bucket.append(row)
+    flush()
+    
+    if delete_ids:
+        session.execute(delete(SectionSeatHistory).where(SectionSeatHistory.id.in_(delete_ids)))
+    if merged_updates:
+        session.execute(update(SectionSeatHistory), merged_updates)
+    write_history(session, keyframes)
+    
+    if merged or expired:
+        logger.info(f"Compacted seat history: merged {merged} rows, expired {expired} rows")
+    
+    return {"merged": merged, "expired": expired}
@@ -158,19 +158,16 @@ class PrerequisiteValidator:
             return all_valid, all_missing
         
         elif node_type == "OR":
-            # At least one child must be satisfied
+            # At least one child must be satisfied. Normalized trees list
+            # course leaves first, so a match usually returns immediately.
+            all_options = []
             for child in tree.get("children", []):
                 valid, missing = self._validate_tree(child, completed_courses)
                 if valid:
                     return True, []
-            
-            # If none are valid, collect all possible options
-            all_options = []
-            for child in tree.get("children", []):
-                _, missing = self._validate_tree(child, completed_courses)
                 all_options.extend(missing)
             
-            # Return unique options
+            # None are valid - return unique options
             return False, list(set(all_options))
         
         else:
@@ -4,28 +4,166 @@ Uses APScheduler to periodically check seat counts and send alerts.
 """
 import asyncio
 import logging
-from datetime import datetime
-from typing import Any
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional, Union
 
+from apscheduler.events import (
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, and_
 
 from database import engine
-from models import Watcher, Section
+from models import Course, Watcher, Section, SectionCheckState
+from services.coordination import ShardCoordinator
 from services.crawler import SFUCrawler
+from services.cycle_metrics import CycleMetrics, CycleMetricsLog
+from services.enrollment_source import (
+    EnrollmentCycle,
+    EnrollmentResult,
+    build_coursys_id,
+    get_enrollment_source,
+    plan_enrollment_requests,
+)
+from services.notifications import SeatAlert, get_dispatcher
+from services.freshness import FreshnessScheduler, SectionSignals, deadline_for_term, next_interval
+from services.resilience import Stale
+from services.event_bus import get_event_bus
+from services.seat_events import SeatChange
+from services.seat_history import KEYFRAME_EVERY, compact_history, delta_row, keyframe_row, write_history
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Seat count columns refreshed by the worker
+SEAT_FIELDS = ('seats_total', 'seats_enrolled', 'waitlist_total', 'waitlist_enrolled')
+
+
+@dataclass
+class SectionCheck:
+    """A watched section detached from the session, and the result of checking it."""
+    
+    section_id: int
+    course_id: str
+    dept: str
+    number: str
+    title: str
+    section_code: str
+    term: str
+    instructor: Optional[str]
+    seats: dict[str, int]
+    watcher_emails: list[str] = field(default_factory=list)
+    has_state: bool = False
+    last_checked_at: Optional[datetime] = None
+    last_changed_at: Optional[datetime] = None
+    checks: int = 0
+    changes: int = 0
+    interval_seconds: Optional[float] = None
+    next_check_at: Optional[datetime] = None
+    recorded_seats: Optional[dict[str, int]] = None
+    deltas_since_keyframe: int = 0
+    result: Union[dict[str, int], Stale, None] = None
+    
+    @property
+    def fresh(self) -> bool:
+        """Whether this cycle got usable seat data."""
+        return isinstance(self.result, dict)
+
+
+def _term_param(term: str) -> tuple[str, str]:
+    """Split a stored term into (year, season), e.g. "Spring 2026" -> ("2026", "spring")."""
+    parts = term.split()
+    if len(parts) == 2:
+        season, year = parts
+        return year, season.lower()
+    return "2026", "spring"  # Default
+
+
+def _seats_from_enrollment(
+    enrollment: EnrollmentResult,
+    previous: dict[str, int]
+) -> Union[dict[str, int], Stale, None]:
+    """
+    Seat counts from a CourSys (enrolled/capacity, waitlist) pair.
+    CourSys doesn't report waitlist capacity, so the stored one is kept.
+    
+    Returns:
+        Seat counts; Stale if CourSys couldn't be reached; None if it had
+        no usable enrollment for the offering
+    """
+    if isinstance(enrollment, Stale):
+        return enrollment
+    
+    enrolled_capacity, waitlist = enrollment
+    try:
+        enrolled, capacity = (int(part) for part in enrolled_capacity.split("/"))
+        waitlist_enrolled = int(waitlist or 0)
+    except (AttributeError, ValueError):
+        return None
+    
+    return {
+        "seats_total": capacity,
+        "seats_enrolled": enrolled,
+        "waitlist_total": previous['waitlist_total'],
+        "waitlist_enrolled": waitlist_enrolled
+    }
+
+
+def _upsert_check_states(session: Session, rows: list[dict[str, Any]]) -> None:
+    """
+    Insert check state for sections checked for the first time.
+    
+    A manual check and a cycle (possibly in another process) can both see
+    a section without state; whichever commits second updates the row
+    instead of failing its whole transaction on the primary key.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        for row in rows:
+            session.merge(SectionCheckState(**row))
+        return
+    
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(SectionCheckState)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SectionCheckState.section_id],
+        set_={
+            column: statement.excluded[column]
+            for column in rows[0] if column != "section_id"
+        }
+    )
+    session.execute(statement, rows)
+
 
 class SeatWatcherWorker:
     """Background worker that monitors seat availability."""
     
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
+        # Never run two cycles of a job at once; runs missed while one was
+        # busy collapse into a single catch-up run
+        self.scheduler = AsyncIOScheduler(job_defaults={"coalesce": True, "max_instances": 1})
+        self.scheduler.add_listener(
+            self._on_job_event,
+            EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED
+        )
+        self.metrics = CycleMetricsLog()
         self.crawler = SFUCrawler()
+        self.enrollment = get_enrollment_source()
+        self.freshness = FreshnessScheduler()
+        self.coordinator = ShardCoordinator()
+        # The rate limiter paces requests; more checks in flight than its
+        # burst would only queue behind it
+        self.concurrency = settings.SEAT_CHECK_CONCURRENCY or max(1, settings.COURSYS_RATE_BURST)
         self.is_running = False
+        self._history_compacted_to: Optional[datetime] = None
     
     def start(self) -> None:
         """Start the background worker."""
@@ -33,18 +171,47 @@ class SeatWatcherWorker:
             logger.warning("Worker is already running")
             return
         
-        # Add the seat checking job
+        # Take and renew shard leases, well before they run out
+        self.scheduler.add_job(
+            self.refresh_leases,
+            trigger=IntervalTrigger(seconds=self.coordinator.lease_seconds / 3),
+            id="worker_leases",
+            name="Renew worker shard leases",
+            next_run_time=datetime.now(),
+            replace_existing=True
+        )
+        
+        # Add the seat checking job. It runs at the shortest per-section
+        # interval and only checks sections whose next check is due.
+        # A run that comes due while a cycle is still going is skipped
+        # (and counted), since the next cycle picks up whatever is due.
+        interval_seconds = settings.SEAT_CHECK_MIN_INTERVAL_MINUTES * 60
         self.scheduler.add_job(
             self.check_all_watchers,
-            trigger=IntervalTrigger(minutes=settings.SEAT_CHECK_INTERVAL_MINUTES),
+            trigger=IntervalTrigger(seconds=interval_seconds),
             id="seat_watcher",
             name="Check seat availability for all watchers",
+            misfire_grace_time=max(1, int(interval_seconds)),
+            replace_existing=True
+        )
+        
+        # Downsample and expire old seat history once a day
+        self.scheduler.add_job(
+            self.compact_seat_history,
+            trigger=IntervalTrigger(hours=24),
+            id="seat_history_compaction",
+            name="Compact seat history",
+            # Once the first lease refresh has settled who holds shard 0
+            next_run_time=datetime.now() + timedelta(seconds=self.coordinator.lease_seconds / 3),
             replace_existing=True
         )
         
         self.scheduler.start()
         self.is_running = True
-        logger.info(f"Seat watcher worker started (checking every {settings.SEAT_CHECK_INTERVAL_MINUTES} minutes)")
+        logger.info(
+            f"Seat watcher worker started (sections checked every "
+            f"{settings.SEAT_CHECK_MIN_INTERVAL_MINUTES:g}-{settings.SEAT_CHECK_MAX_INTERVAL_MINUTES:g} minutes)"
+        )
     
     def stop(self) -> None:
         """Stop the background worker."""
@@ -53,158 +220,449 @@ class SeatWatcherWorker:
         
         self.scheduler.shutdown()
         self.is_running = False
+        
+        try:
+            self.coordinator.release_all()
+        except Exception as e:
+            logger.warning(f"Could not release worker leases: {e}")
         logger.info("Seat watcher worker stopped")
     
+    async def refresh_leases(self) -> None:
+        """Renew this worker's shard leases off the event loop."""
+        try:
+            await asyncio.to_thread(self.coordinator.refresh)
+        except Exception as e:
+            # Keep working on the shards we had; they expire if this keeps failing
+            logger.error(f"Error refreshing worker leases: {e}", exc_info=True)
+    
     async def check_all_watchers(self) -> None:
         """
         Main job that checks all active watchers.
-        Groups by section to avoid redundant API calls.
+        Groups by section to avoid redundant API calls and only checks
+        sections whose adaptive interval has elapsed. When more are due than
+        the request budget allows, the ones most likely to have changed go first.
+        
+        Runs in phases so no database connection is held during network
+        I/O: a short read, the concurrent upstream fetches, then a single
+        bulk write for the whole cycle, then queueing alerts. Each cycle's
+        timings are recorded in self.metrics.
         """
+        metrics = CycleMetrics(start_delay_seconds=self._start_delay())
+        cycle_start = time.perf_counter()
+        
         try:
+            shards = set(self.coordinator.owned)
+            if not shards:
+                logger.info("No shard leases held; another worker is checking seats")
+                return
+            metrics.shards = sorted(shards)
+            
             logger.info("Starting seat availability check...")
             
-            with Session(engine) as session:
-                # Get all active watchers
-                statement = select(Watcher).where(Watcher.is_active == True)
-                watchers = session.exec(statement).all()
-                
-                if not watchers:
-                    logger.info("No active watchers found")
-                    return
-                
-                logger.info(f"Checking {len(watchers)} active watchers")
-                
-                # Group watchers by section to minimize API calls
-                sections_to_check: dict[int, list[Watcher]] = {}
-                for watcher in watchers:
-                    if watcher.section_id not in sections_to_check:
-                        sections_to_check[watcher.section_id] = []
-                    sections_to_check[watcher.section_id].append(watcher)
-                
-                # Check each unique section
-                alerts_sent = 0
-                for section_id, section_watchers in sections_to_check.items():
-                    seats_opened = await self._check_section(session, section_id, section_watchers)
-                    if seats_opened:
-                        alerts_sent += len(section_watchers)
-                
-                logger.info(f"Seat check complete. Alerts sent: {alerts_sent}")
-                
+            checks = await asyncio.to_thread(self._snapshot_checks, shards=shards)
+            metrics.watched = len(checks)
+            
+            if not checks:
+                logger.info("No active watchers found")
+                return
+            
+            now = datetime.utcnow()
+            due = [check for check in checks if check.next_check_at is None or check.next_check_at <= now]
+            metrics.due = len(due)
+            metrics.max_overdue_seconds = max(
+                ((now - check.next_check_at).total_seconds() for check in due if check.next_check_at),
+                default=0.0
+            )
+            if not due:
+                logger.info(f"No sections due ({len(checks)} watched)")
+                return
+            
+            selected = self._prioritize(due)
+            metrics.checked = len(selected)
+            logger.info(f"Checking {len(selected)} of {len(due)} due sections ({len(checks)} watched)")
+            
+            await self._fetch_all(selected, metrics.upstream_ms)
+            metrics.write_ms = await asyncio.to_thread(self._write_results, selected)
+            metrics.stale = sum(1 for check in selected if not check.fresh)
+            metrics.changed = await self._publish_changes(selected)
+            
+            metrics.alerts_queued = sum(self._alert_if_opened(check) for check in selected)
+            
+            logger.info(f"Seat check complete. Alerts queued: {metrics.alerts_queued}")
+        
         except Exception as e:
             logger.error(f"Error in check_all_watchers: {e}", exc_info=True)
+        
+        finally:
+            if metrics.shards:
+                metrics.duration_seconds = time.perf_counter() - cycle_start
+                self.metrics.record(metrics)
+    
+    def _start_delay(self) -> float:
+        """Seconds between the cycle's scheduled time and now."""
+        scheduled_at = self.metrics.scheduled_at
+        if scheduled_at is None:
+            return 0.0
+        
+        self.metrics.scheduled_at = None
+        return max(0.0, (datetime.now(scheduled_at.tzinfo) - scheduled_at).total_seconds())
+    
+    def _on_job_event(self, event: JobEvent) -> None:
+        """Track when cycles were due and which runs the scheduler dropped."""
+        if event.job_id != "seat_watcher":
+            return
+        
+        if event.code == EVENT_JOB_SUBMITTED:
+            self.metrics.scheduled_at = event.scheduled_run_times[-1]
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            self.metrics.skipped_overlapping += 1
+            logger.warning("Seat check cycle skipped: the previous cycle is still running")
+        elif event.code == EVENT_JOB_MISSED:
+            self.metrics.missed += 1
+            logger.warning(f"Seat check cycle due at {event.scheduled_run_time} was missed")
+    
+    def _snapshot_checks(
+        self,
+        section_id: Optional[int] = None,
+        shards: Optional[set[int]] = None
+    ) -> list[SectionCheck]:
+        """_load_checks in a session of its own, so it can run in a worker thread."""
+        with Session(engine) as session:
+            return self._load_checks(session, section_id, shards)
     
-    async def _check_section(
+    def _load_checks(
         self,
         session: Session,
-        section_id: int,
-        watchers: list[Watcher]
-    ) -> bool:
+        section_id: Optional[int] = None,
+        shards: Optional[set[int]] = None
+    ) -> list[SectionCheck]:
         """
-        Check a specific section for seat availability.
+        Snapshot the watched sections (or one section) for a cycle.
+        
+        A single joined query returns each section with its course, check
+        state and active watcher emails, so the cost doesn't grow with the
+        number of sections.
+        
+        Args:
+            session: Database session
+            section_id: Load only this section, watched or not
+            shards: Load only sections in these shards (see shard_for)
         
         Returns:
-            True if seats became available, False otherwise
+            One SectionCheck per section with at least one active watcher,
+            or the requested section even if nobody is watching it
+        """
+        statement = (
+            select(Section, Course, SectionCheckState, Watcher.user_email)
+            .join(Course, Course.id == Section.course_id)
+            .join(
+                Watcher,
+                and_(Watcher.section_id == Section.id, Watcher.is_active == True),
+                # A manual check works on unwatched sections too
+                isouter=section_id is not None
+            )
+            .join(SectionCheckState, SectionCheckState.section_id == Section.id, isouter=True)
+            .order_by(Section.id)
+        )
+        if section_id is not None:
+            statement = statement.where(Section.id == section_id)
+        if shards is not None and self.coordinator.shards > 1:
+            statement = statement.where((Section.id % self.coordinator.shards).in_(shards))
+        
+        # Group watcher rows by section to minimize API calls
+        checks: dict[int, SectionCheck] = {}
+        for section, course, state, user_email in session.exec(statement):
+            check = checks.get(section.id)
+            if check is None:
+                check = checks[section.id] = SectionCheck(
+                    section_id=section.id,
+                    course_id=course.id,
+                    dept=course.dept,
+                    number=course.number,
+                    title=course.title,
+                    section_code=section.section_code,
+                    term=section.term,
+                    instructor=section.instructor,
+                    seats={field: getattr(section, field) for field in SEAT_FIELDS},
+                    has_state=state is not None,
+                    last_checked_at=state.last_checked_at if state else None,
+                    last_changed_at=state.last_changed_at if state else None,
+                    checks=state.checks if state else 0,
+                    changes=state.changes if state else 0,
+                    interval_seconds=state.interval_seconds if state else None,
+                    next_check_at=state.next_check_at if state else None,
+                    recorded_seats=state.recorded_seats if state else None,
+                    deltas_since_keyframe=state.deltas_since_keyframe if state else 0
+                )
+            if user_email is not None:
+                check.watcher_emails.append(user_email)
+        
+        return list(checks.values())
+    
+    def _prioritize(self, checks: list[SectionCheck]) -> list[SectionCheck]:
+        """
+        Order watched sections by freshness priority, cut to the request budget.
+        
+        The budget is charged per CourSys offering, the unit _fetch_all
+        fetches, so sections sharing an offering cost one request.
+        """
+        by_id = {check.section_id: check for check in checks}
+        
+        candidates = [
+            SectionSignals(
+                section_id=check.section_id,
+                watchers=len(check.watcher_emails),
+                seats_total=check.seats['seats_total'],
+                seats_enrolled=check.seats['seats_enrolled'],
+                waitlist_total=check.seats['waitlist_total'],
+                waitlist_enrolled=check.seats['waitlist_enrolled'],
+                last_checked_at=check.last_checked_at,
+                last_changed_at=check.last_changed_at,
+                deadline=deadline_for_term(check.term),
+                fetch_key=build_coursys_id(
+                    *_term_param(check.term), check.dept, check.number, check.section_code
+                )
+            )
+            for check in checks
+        ]
+        
+        return [by_id[signals.section_id] for signals in self.freshness.select(candidates)]
+    
+    async def _fetch_all(self, checks: list[SectionCheck], latencies_ms: Optional[list[float]] = None) -> None:
+        """
+        Network phase: fetch seat counts for every check concurrently.
+        
+        Sections are grouped by CourSys offering (D100, D101 and D102 share
+        "d1"); each offering is fetched once and its enrollment fanned out
+        to every section in it.
+        
+        Args:
+            checks: Sections to fetch
+            latencies_ms: If given, receives each offering fetch's duration
+        """
+        by_term: dict[tuple[str, str], dict[tuple[str, str, str], SectionCheck]] = {}
+        for check in checks:
+            key = (check.dept, check.number, check.section_code)
+            by_term.setdefault(_term_param(check.term), {})[key] = check
+        
+        plan: dict[str, list[SectionCheck]] = {}
+        for (year, season), term_checks in by_term.items():
+            for offering_id, keys in plan_enrollment_requests(year, season, term_checks).items():
+                plan[offering_id] = [term_checks[key] for key in keys]
+        
+        # Offerings are fetched once per cycle however many sections share them
+        cycle = self.enrollment.cycle()
+        limit = asyncio.Semaphore(self.concurrency)
+        
+        async def fetch(offering_id: str, group: list[SectionCheck]) -> None:
+            async with limit:
+                start = time.perf_counter()
+                await self._fetch_offering(offering_id, group, cycle)
+                if latencies_ms is not None:
+                    latencies_ms.append((time.perf_counter() - start) * 1000)
+        
+        await asyncio.gather(*[fetch(offering_id, group) for offering_id, group in plan.items()])
+    
+    async def _fetch_section(self, check: SectionCheck) -> None:
+        """Fetch the current seat count for one section into check.result."""
+        year, season = _term_param(check.term)
+        offering_id = build_coursys_id(year, season, check.dept, check.number, check.section_code)
+        await self._fetch_offering(offering_id, [check])
+    
+    async def _fetch_offering(
+        self,
+        offering_id: str,
+        group: list[SectionCheck],
+        cycle: Optional[EnrollmentCycle] = None
+    ) -> None:
+        """
+        Fetch one CourSys offering's enrollment into each check.result.
+        
+        Enrollment comes from the offering's CourSys page; a
+        section's own seat page is only scraped when CourSys has nothing
+        usable for the offering.
+        
+        Args:
+            offering_id: CourSys offering id, e.g. "2025fa-cmpt-120-d1"
+            group: Sections in the offering
+            cycle: Check cycle to look up through; without one the
+                offering is fetched from CourSys now
         """
         try:
-            # Get the section from database
-            section = session.get(Section, section_id)
+            enrollment = await (cycle or self.enrollment).fetch(offering_id)
+        except Exception as e:
+            logger.error(f"Error fetching enrollment for {offering_id}: {e}", exc_info=True)
+            enrollment = Stale(str(e))
+        
+        for check in group:
+            try:
+                check.result = _seats_from_enrollment(enrollment, check.seats)
+                if check.result is None:
+                    year, season = _term_param(check.term)
+                    check.result = await self.crawler.fetch_seat_count(
+                        dept=check.dept,
+                        number=check.number,
+                        section=check.section_code,
+                        term=f"{year}/{season}"
+                    )
+            except Exception as e:
+                logger.error(f"Error checking section {check.section_id}: {e}", exc_info=True)
+                check.result = Stale(str(e))
             
-            if not section:
-                logger.warning(f"Section {section_id} not found")
-                return False
+            if isinstance(check.result, Stale):
+                # Keep the last known counts rather than writing zeros
+                logger.warning(f"Seat data for {check.course_id} {check.section_code} is stale: {check.result.reason}")
+    
+    def _write_results(self, checks: list[SectionCheck]) -> float:
+        """
+        Write phase: persist every fresh result in one transaction.
+        
+        Sections are only rewritten and seat history only recorded when
+        their counts changed; check state and the next check time are
+        recorded for every fresh result.
+        
+        Returns:
+            Milliseconds spent writing
+        """
+        now = datetime.utcnow()
+        section_updates, history_rows = [], []
+        state_inserts, state_updates = [], []
+        
+        for check in checks:
+            if not check.fresh:
+                continue
             
-            # Parse course info from section
-            course = section.course
-            if not course:
-                logger.warning(f"Course not found for section {section_id}")
-                return False
+            changed = check.result != check.seats
+            if changed:
+                section_updates.append({"id": check.section_id, **check.result, "updated_at": now})
             
-            # Fetch current seat count from SFU
-            # Parse term format (e.g., "Spring 2026" -> "2026/spring")
-            term_parts = section.term.split()
-            if len(term_parts) == 2:
-                season, year = term_parts
-                term_param = f"{year}/{season.lower()}"
-            else:
-                term_param = "2026/spring"  # Default
+            # Deltas chain from what the history last recorded, not from the
+            # section row, which re-crawls and other writers also update.
+            # A section's first check starts its history with absolute counts.
+            recorded = check.recorded_seats
+            deltas = check.deltas_since_keyframe
+            if recorded is None or (check.result != recorded and deltas + 1 >= KEYFRAME_EVERY):
+                history_rows.append(keyframe_row(check.section_id, now, check.result))
+                deltas = 0
+            elif check.result != recorded:
+                history_rows.append(delta_row(check.section_id, now, recorded, check.result))
+                deltas += 1
             
-            seat_data = await self.crawler.fetch_seat_count(
-                dept=course.dept,
-                number=course.number,
-                section=section.section_code,
-                term=term_param
+            full_and_watched = (
+                check.result['seats_total'] - check.result['seats_enrolled'] <= 0
+                and bool(check.watcher_emails)
             )
+            interval = next_interval(check.interval_seconds, changed, full_and_watched)
             
-            # Check if seats opened up
-            old_available = section.seats_total - section.seats_enrolled
-            new_available = seat_data['seats_total'] - seat_data['seats_enrolled']
-            
-            # Update section in database
-            section.seats_total = seat_data['seats_total']
-            section.seats_enrolled = seat_data['seats_enrolled']
-            section.waitlist_total = seat_data['waitlist_total']
-            section.waitlist_enrolled = seat_data['waitlist_enrolled']
-            section.updated_at = datetime.utcnow()
-            session.add(section)
+            state_row = {
+                "section_id": check.section_id,
+                "last_checked_at": now,
+                "last_changed_at": now if changed else check.last_changed_at,
+                "checks": check.checks + 1,
+                "changes": check.changes + (1 if changed else 0),
+                "interval_seconds": interval,
+                "next_check_at": now + timedelta(seconds=interval),
+                "recorded_seats": check.result,
+                "deltas_since_keyframe": deltas
+            }
+            (state_updates if check.has_state else state_inserts).append(state_row)
+        
+        if not (section_updates or state_inserts or state_updates):
+            return 0.0
+        
+        start = time.perf_counter()
+        with Session(engine) as session:
+            if section_updates:
+                session.execute(update(Section), section_updates)
+            if state_updates:
+                session.execute(update(SectionCheckState), state_updates)
+            if state_inserts:
+                _upsert_check_states(session, state_inserts)
+            write_history(session, history_rows)
             session.commit()
-            
-            # If seats became available, send alerts
-            if new_available > 0 and old_available == 0:
-                logger.info(f"🎉 SEATS OPENED for {course.id} {section.section_code}!")
-                
-                for watcher in watchers:
-                    await self._send_alert(watcher, section, new_available)
-                
-                return True
-            
-            elif new_available > old_available:
-                logger.info(f"Seats increased for {course.id} {section.section_code}: {old_available} -> {new_available}")
-                
-                for watcher in watchers:
-                    await self._send_alert(watcher, section, new_available)
-                
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error checking section {section_id}: {e}", exc_info=True)
-            return False
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        logger.info(
+            f"Wrote {len(section_updates)} changed sections, "
+            f"{len(state_inserts) + len(state_updates)} check states and "
+            f"{len(history_rows)} history rows in {elapsed_ms:.0f}ms"
+        )
+        return elapsed_ms
     
-    async def _send_alert(
-        self,
-        watcher: Watcher,
-        section: Section,
-        seats_available: int
-    ) -> None:
+    async def _publish_changes(self, checks: list[SectionCheck]) -> int:
         """
-        Send an alert to a watcher.
-        For now, this just logs to console. In production, this would send an email.
+        Push changed seat counts to live clients (SSE and WebSocket) in
+        every API process, through the event bus.
         
-        Args:
-            watcher: The watcher object
-            section: The section with available seats
-            seats_available: Number of seats now available
+        Returns:
+            Number of sections that changed
         """
-        course = section.course
-        
-        alert_message = (
-            f"🔔 ALERT SENT to {watcher.user_email}\n"
-            f"   Course: {course.dept} {course.number} - {course.title}\n"
-            f"   Section: {section.section_code}\n"
-            f"   Term: {section.term}\n"
-            f"   Seats Available: {seats_available}/{section.seats_total}\n"
-            f"   Instructor: {section.instructor or 'TBD'}\n"
-        )
+        changes = [
+            SeatChange(section_id=check.section_id, **check.result)
+            for check in checks
+            if check.fresh and check.result != check.seats
+        ]
+        await get_event_bus().publish(changes)
+        return len(changes)
+    
+    def _alert_if_opened(self, check: SectionCheck) -> int:
+        """
+        Queue alerts for watchers if seats opened up or increased.
+        Sending happens in the notification dispatcher, not in the cycle.
+        
+        Returns:
+            Number of watchers alerted
+        """
+        if not check.fresh:
+            return 0
         
-        logger.info(alert_message)
+        old_available = check.seats['seats_total'] - check.seats['seats_enrolled']
+        new_available = check.result['seats_total'] - check.result['seats_enrolled']
         
-        # TODO: In production, send actual email here
-        # await send_email(
-        #     to=watcher.user_email,
-        #     subject=f"Seats Available: {course.dept} {course.number}",
-        #     body=alert_message
-        # )
+        if new_available > 0 and old_available == 0:
+            logger.info(f"🎉 SEATS OPENED for {check.course_id} {check.section_code}!")
+        elif new_available > old_available:
+            logger.info(f"Seats increased for {check.course_id} {check.section_code}: {old_available} -> {new_available}")
+        else:
+            return 0
+        
+        dispatcher = get_dispatcher()
+        queued = 0
+        for user_email in check.watcher_emails:
+            queued += dispatcher.enqueue(SeatAlert(
+                user_email=user_email,
+                section_id=check.section_id,
+                dept=check.dept,
+                number=check.number,
+                title=check.title,
+                section_code=check.section_code,
+                term=check.term,
+                instructor=check.instructor,
+                seats_available=new_available,
+                seats_total=check.result['seats_total']
+            ))
+        
+        return queued
+    
+    async def compact_seat_history(self) -> None:
+        """Downsample and expire old seat history off the event loop."""
+        # One worker is enough; the holder of shard 0 does it
+        if 0 not in self.coordinator.owned:
+            return
+        
+        try:
+            await asyncio.to_thread(self._compact_seat_history)
+        except Exception as e:
+            logger.error(f"Error compacting seat history: {e}", exc_info=True)
+    
+    def _compact_seat_history(self) -> None:
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            # Rows before the last run's cutoff were already downsampled
+            compact_history(session, now, since=self._history_compacted_to)
+            session.commit()
+        self._history_compacted_to = now - timedelta(days=settings.SEAT_HISTORY_RAW_DAYS)
     
     async def check_specific_section(self, section_id: int) -> dict[str, Any]:
         """
@@ -215,34 +673,31 @@ class SeatWatcherWorker:
             Dictionary with check results
         """
         try:
-            with Session(engine) as session:
-                section = session.get(Section, section_id)
-                
-                if not section:
-                    return {
-                        "success": False,
-                        "message": f"Section {section_id} not found"
-                    }
-                
-                # Get watchers for this section
-                statement = select(Watcher).where(
-                    Watcher.section_id == section_id,
-                    Watcher.is_active == True
-                )
-                watchers = session.exec(statement).all()
-                
-                # Check the section
-                seats_opened = await self._check_section(session, section_id, watchers)
-                
+            checks = await asyncio.to_thread(self._snapshot_checks, section_id)
+            
+            if not checks:
                 return {
-                    "success": True,
-                    "section_id": section_id,
-                    "course": f"{section.course.dept} {section.course.number}",
-                    "seats_available": section.seats_total - section.seats_enrolled,
-                    "watchers_alerted": len(watchers) if seats_opened else 0,
-                    "message": "Check complete"
+                    "success": False,
+                    "message": f"Section {section_id} not found"
                 }
-                
+            
+            check = checks[0]
+            # Outside any cycle, so the result isn't one a cycle already fetched
+            await self._fetch_section(check)
+            await asyncio.to_thread(self._write_results, checks)
+            await self._publish_changes(checks)
+            watchers_alerted = self._alert_if_opened(check)
+            
+            seats = check.result if check.fresh else check.seats
+            return {
+                "success": True,
+                "section_id": section_id,
+                "course": f"{check.dept} {check.number}",
+                "seats_available": seats['seats_total'] - seats['seats_enrolled'],
+                "watchers_alerted": watchers_alerted,
+                "message": "Check complete" if check.fresh else "Upstream unavailable; showing last known seats"
+            }
+        
         except Exception as e:
             logger.error(f"Error checking section {section_id}: {e}")
             return {
@@ -0,0 +1,54 @@
+"""
+Seat Watcher Worker Entrypoint.
+Runs the seat checks and alert delivery without the API, so API replicas
+can set RUN_WORKER_IN_API=false and the checks scale separately. Start as
+many of these as needed; they split the sections between them through
+shard leases (see WORKER_SHARDS).
+
+Usage:
+    python worker.py
+"""
+import asyncio
+import logging
+import signal
+
+from database import create_db_and_tables
+from services.http_client import get_http_client, close_http_client
+from services.event_bus import start_event_bus, stop_event_bus
+from services.notifications import start_dispatcher, stop_dispatcher
+from services.worker import start_worker, stop_worker
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    """Run the worker until SIGINT or SIGTERM."""
+    create_db_and_tables()
+    get_http_client()
+    # Publish only; the API processes deliver to their clients
+    await start_event_bus(listen=False)
+    start_dispatcher()
+    start_worker()
+    logger.info("Seat watcher worker process started")
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    await stop.wait()
+    
+    logger.info("Shutting down seat watcher worker process...")
+    stop_worker()
+    await stop_dispatcher()
+    await stop_event_bus()
+    await close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())